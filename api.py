@@ -0,0 +1,237 @@
+import argparse
+import hashlib
+import http.server
+import io
+import json
+import urllib.parse
+
+import pyarrow as pa
+
+import caching
+import cube
+import data
+import regression
+import summary
+
+# Default address, next to Streamlit's 8501.
+HOST = '127.0.0.1'
+PORT = 8502
+
+# Response formats and their content types.
+FORMATS = {'json': 'application/json',
+           'arrow': 'application/vnd.apache.arrow.stream'}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def datasets(params):
+    # Labels and years of every dataset.
+    result = {}
+    for metric in data.METRICS:
+        values = cube.load_cube(metric)
+        result[metric] = {'sectors': values.sectors,
+                          'providers': values.providers,
+                          'states': values.states,
+                          'years': [int(values.years[0]), int(values.years[-1])]}
+
+    return result
+
+
+def choropleth(params):
+    # Every state, or the DMV states, for one year.
+    values = _cube(params)
+
+    return values.choropleth_df(sector=_get(params, 'sector'),
+                                provider=_provider(params, values),
+                                year=_int(params, 'year'),
+                                states=_states(params))
+
+
+def line(params):
+    # States, the DMV by default, over a year range, every year by default.
+    values = _cube(params)
+    years = (_int(params, 'start', int(values.years[0])), _int(params, 'end', int(values.years[-1])))
+
+    return values.line_df(sector=_get(params, 'sector'),
+                          provider=_provider(params, values),
+                          states=_states(params) or data.DMV,
+                          years=years)
+
+
+def coefficients(params):
+    # Fitted OLS lines, one row per series.
+    return _rows(regression.load_coefficients(), params)
+
+
+def statistics(params):
+    # Summary statistics, one row per series.
+    return _rows(summary.load_summary(), params)
+
+
+# Endpoint paths.
+ROUTES = {'/datasets': datasets,
+          '/choropleth': choropleth,
+          '/line': line,
+          '/coefficients': coefficients,
+          '/summary': statistics}
+
+
+def etag(path, params):
+    # Responses only depend on the query and the workbooks, so the tag is known before any work is done.
+    key = json.dumps([data.fingerprint(), path, sorted(params.items())])
+
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+@caching.bounded_cache(max_entries=256, version=data.fingerprint)
+def body(path, params, file_format):
+    result = ROUTES[path](dict(params))
+
+    # Plain dictionaries are JSON only.
+    if isinstance(result, dict):
+        return json.dumps(result).encode()
+
+    if file_format == 'arrow':
+        table = pa.Table.from_pandas(result, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue()
+
+    return result.to_json(orient='records').encode()
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    # GET only, every response can be revalidated with If-None-Match.
+
+    # Keep connections open between requests.
+    protocol_version = 'HTTP/1.1'
+
+    # Headers and body are written separately, do not let Nagle's algorithm hold the body back.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+
+        if url.path not in ROUTES:
+            return self._error(404, f'Unknown endpoint {url.path}, try one of {", ".join(ROUTES)}')
+
+        # Format from the query, or from the Accept header.
+        file_format = params.pop('format', None)
+        if file_format is None:
+            file_format = 'arrow' if FORMATS['arrow'] in self.headers.get('Accept', '') else 'json'
+        if file_format not in FORMATS:
+            return self._error(400, f'Unknown format {file_format}')
+
+        # The client already has this version.
+        tag = etag(url.path, {**params, 'format': file_format})
+        if tag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', tag)
+            self.end_headers()
+            return
+
+        try:
+            content = body(url.path, tuple(sorted(params.items())), file_format)
+        except BadRequest as error:
+            return self._error(400, str(error))
+        except KeyError as error:
+            return self._error(404, f'No data for {error}')
+
+        content_type = FORMATS['json'] if url.path == '/datasets' else FORMATS[file_format]
+        self._send(200, content, content_type, tag)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({'error': message}).encode(), FORMATS['json'])
+
+    def _send(self, status, content, content_type, tag=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        if tag:
+            # Clients may keep the response but must revalidate it.
+            self.send_header('ETag', tag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        # Keep the console quiet, the load test sends thousands of requests.
+        pass
+
+
+def serve(host=HOST, port=PORT):
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+
+    return server
+
+
+def _cube(params):
+    metric = _get(params, 'metric')
+    if metric not in data.METRICS:
+        raise BadRequest(f'metric must be one of {", ".join(data.METRICS)}')
+
+    return cube.load_cube(metric)
+
+
+def _rows(table, params):
+    # Rows matching the given labels, e.g. state=MD.
+    mask = True
+    for level in table.index.names:
+        if level.lower() in params:
+            mask = mask & (table.index.get_level_values(level) == params[level.lower()])
+
+    return table[mask].reset_index() if mask is not True else table.reset_index()
+
+
+def _get(params, name, default=None):
+    value = params.get(name, default)
+    if value is None:
+        raise BadRequest(f'{name} is required')
+
+    return value
+
+
+def _int(params, name, default=None):
+    try:
+        return int(_get(params, name, default))
+    except ValueError:
+        raise BadRequest(f'{name} must be a year')
+
+
+def _provider(params, values):
+    # All providers for consumption, the whole industry for price.
+    return params.get('provider', values.providers[0])
+
+
+def _states(params):
+    # Comma separated states, or dmv.
+    states = params.get('states')
+    if states is None:
+        return None
+
+    return data.DMV if states.lower() == 'dmv' else tuple(states.split(','))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the slices of the app as JSON or Arrow over HTTP.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    args = parser.parse_args()
+
+    # Load the data before the first request.
+    data.warm_up()
+    regression.load_coefficients()
+    summary.load_summary()
+
+    server = serve(args.host, args.port)
+    print(f'Serving on http://{args.host}:{server.server_port}, endpoints {", ".join(ROUTES)}')
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
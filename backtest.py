@@ -0,0 +1,162 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import cube
+import data
+import ingest
+import models
+
+# Index of the backtest table.
+INDEX = models.INDEX + ['Horizon']
+
+# Backtest saved in the cache by a run or an incremental refresh, too slow to run while the app starts.
+TABLE = ingest.Table('backtest', INDEX, lambda: run())
+
+# Years ahead each forecast is scored at.
+HORIZONS = (1, 2, 3, 5)
+
+# Observed years a series needs before a forecast from it is scored.
+MIN_YEARS = 10
+
+
+def read_backtest(digests=None):
+    # Table saved for the given workbook hashes, the current ones by default, or None.
+    return TABLE.read(digests or data.fingerprint())
+
+
+def scores(model, metric, sector, provider, state):
+    # Errors of one model on one series, from the saved table or else backtested on its own.
+    table = read_backtest()
+    if table is None:
+        series = pd.MultiIndex.from_tuples([(metric, sector, provider, state)], names=models.INDEX[1:])
+        table = run(series=series, names=(model,), max_workers=1)
+
+    # Series without a scored forecast have no rows.
+    try:
+        return table.loc[(model, metric, sector, provider, state)]
+    except KeyError:
+        return pd.DataFrame(columns=table.columns, index=pd.Index([], name='Horizon'))
+
+
+def summarize(table):
+    # Mean errors per model and horizon over every series of a dataset, MAE is only comparable within one.
+    df = table.reset_index()
+    df['abs_errors'] = df['mae'] * df['origins']
+    # MAPE is weighted by origins too, the few zero values it skips are counted.
+    df['pct_errors'] = df['mape'] * df['origins']
+    df = df.groupby(['Metric', 'Model', 'Horizon'], sort=False).agg(series=('origins', 'size'),
+                                                                     origins=('origins', 'sum'),
+                                                                     abs_errors=('abs_errors', 'sum'),
+                                                                     pct_errors=('pct_errors', 'sum'))
+    df['mae'] = df['abs_errors'] / df['origins']
+    df['mape'] = df['pct_errors'] / df['origins']
+
+    return df[['series', 'origins', 'mae', 'mape']].sort_index()
+
+
+def run(series=None, names=tuple(models.MODELS), max_workers=None):
+    # Rolling origin: refit on every year up to each origin and score the forecasts HORIZONS years later.
+    tasks = []
+    series_labels = {}
+    for metric in data.METRICS:
+        years, rows, labels = cube.rows(metric, series)
+
+        # Series with enough years to score at least one forecast.
+        keep = (~np.isnan(rows)).sum(axis=1) > MIN_YEARS
+        rows = rows[keep]
+        labels = [label for label, kept in zip(labels, keep) if kept]
+
+        series_labels[metric] = labels
+        if labels:
+            for model in names:
+                tasks += [(model, metric, years, rows, origin) for origin in years[MIN_YEARS - 1:-1]]
+
+    if not tasks:
+        return pd.DataFrame(columns=INDEX + ['mae', 'mape', 'origins']).set_index(INDEX)
+
+    # Score in parallel.
+    args = [(model, years, rows, origin) for model, metric, years, rows, origin in tasks]
+    results = ingest.map_spawned(_score, args, max_workers)
+
+    # Add up the origins of each model and dataset.
+    totals = {}
+    for (model, metric, years, rows, origin), errors in zip(tasks, results):
+        key = (model, metric)
+        totals[key] = totals.get(key, 0) + errors
+
+    frames = []
+    for (model, metric), (abs_errors, pct_errors, counts, pct_counts) in totals.items():
+        index = pd.MultiIndex.from_tuples([(model,) + label + (horizon,) for label in series_labels[metric]
+                                           for horizon in HORIZONS],
+                                          names=INDEX)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df = pd.DataFrame({'mae': (abs_errors / counts).ravel(),
+                               'mape': (pct_errors / pct_counts * 100).ravel(),
+                               'origins': counts.ravel().astype('int64')},
+                              index=index)
+
+        # Horizons no origin could be scored at.
+        frames.append(df[df['origins'] > 0])
+
+    return pd.concat(frames).sort_index()
+
+
+def update_backtest(table, series):
+    # Rerun the given (metric, sector, provider, state) series, keep the other rows.
+    kept = table[~table.index.droplevel(['Model', 'Horizon']).isin(series)]
+
+    return pd.concat([kept, run(series)]).sort_index()
+
+
+def _score(model, years, rows, origin):
+    # Fit on the years up to the origin only.
+    train = years <= origin
+    df = models.MODELS[model]['fit'](years[train], rows[:, train])
+
+    # Forecast the horizons that are still in the data.
+    targets = origin + np.asarray(HORIZONS, dtype='float64')
+    columns = np.searchsorted(years, targets)
+    inside = columns < len(years)
+    actual = np.full((len(rows), len(HORIZONS)), np.nan)
+    actual[:, inside] = rows[:, columns[inside]]
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        prediction = models.MODELS[model]['predict'](df, targets)
+        errors = np.abs(prediction - actual)
+        pct = errors / np.abs(actual)
+
+    # Only series with enough years up to the origin and a value at the horizon count.
+    enough = (df['n'].to_numpy() >= MIN_YEARS)[:, None]
+    scored = enough & ~np.isnan(errors)
+    pct_scored = scored & (actual != 0)
+
+    return np.stack([np.where(scored, errors, 0),
+                     np.where(pct_scored, pct, 0),
+                     scored.astype('float64'),
+                     pct_scored.astype('float64')])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest every forecasting model on every series with rolling '
+                                                 'origins and report MAE and MAPE per model and horizon.')
+    parser.add_argument('--workers', type=int, help='worker processes, the CPU count by default')
+    parser.add_argument('--force', action='store_true', help='rerun even if the workbooks did not change')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = None if args.force else read_backtest()
+    if df is None:
+        df = run(max_workers=args.workers)
+        TABLE.save(df, data.fingerprint())
+    print(f'Backtest took {time.perf_counter() - start:.1f} s.')
+
+    pd.set_option('display.width', 120)
+    print(summarize(df).to_string(float_format=lambda value: f'{value:,.3f}'))
+
+
+if __name__ == '__main__':
+    main()
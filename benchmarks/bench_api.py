@@ -0,0 +1,163 @@
+import argparse
+import concurrent.futures
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.parse
+
+# Run from the repository root so the workbooks are found.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the query API on localhost.')
+    parser.add_argument('--requests', type=int, default=2000, help='requests per phase')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='JSON file for the results')
+    args = parser.parse_args()
+
+    # Serve from another process so clients and server do not share a GIL.
+    port = _free_port()
+    server = subprocess.Popen([sys.executable, 'api.py', '--port', str(port)],
+                              stdout=subprocess.DEVNULL)
+    try:
+        _wait(port)
+
+        paths = _paths(port, random.Random(args.seed))
+        results = []
+
+        # First request of every query, the server builds each body.
+        results.append(_phase('cold', port, paths, [None] * len(paths), args.concurrency))
+
+        # Same queries again, bodies come from the server's cache.
+        rng = random.Random(args.seed)
+        requests = [rng.choice(paths) for _ in range(args.requests)]
+        results.append(_phase('warm', port, requests, [None] * len(requests), args.concurrency))
+
+        # Revalidation with the ETags from the first phase, answered with 304 and no body.
+        tags = dict(zip(paths, results[0].pop('tags')))
+        results.append(_phase('304', port, requests, [tags[path] for path in requests], args.concurrency))
+        results[1].pop('tags')
+        results[2].pop('tags')
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f'{"phase":<6} {"requests":>8} {"req/s":>8} {"p50 ms":>7} {"p90 ms":>7} {"p99 ms":>7} {"KiB/req":>8} '
+          f'statuses')
+    for result in results:
+        print(f'{result["phase"]:<6} {result["requests"]:>8} {result["rps"]:>8.0f} {result["p50"]:>7.2f} '
+              f'{result["p90"]:>7.2f} {result["p99"]:>7.2f} {result["bytes"] / result["requests"] / 1024:>8.1f} '
+              f'{result["statuses"]}')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+def _paths(port, rng):
+    # A mix of the queries the app makes, from the labels the API reports.
+    labels = json.loads(_get(http.client.HTTPConnection('127.0.0.1', port), '/datasets')[2])
+
+    paths = []
+    for metric, dataset in labels.items():
+        first, last = dataset['years']
+        providers = dataset['providers']
+
+        for sector in dataset['sectors']:
+            for provider in providers:
+                query = {'metric': metric, 'sector': sector, 'provider': provider}
+                paths.append(f'/line?{urllib.parse.urlencode({**query, "start": rng.randint(first, last)})}')
+                paths.append(f'/choropleth?{urllib.parse.urlencode({**query, "year": rng.randint(first, last)})}')
+                paths.append(f'/choropleth?{urllib.parse.urlencode({**query, "year": last, "states": "dmv"})}')
+                paths.append(f'/coefficients?{urllib.parse.urlencode({**query, "state": rng.choice(["DC", "MD", "VA"])})}')
+
+    return paths
+
+
+def _phase(name, port, paths, tags, concurrency):
+    # Split the requests over the clients, one keep-alive connection each.
+    chunks = [list(zip(paths[i::concurrency], tags[i::concurrency])) for i in range(concurrency)]
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = [outcome for chunk in pool.map(lambda chunk: _client(port, chunk), chunks) for outcome in chunk]
+    elapsed = time.perf_counter() - start
+
+    # Put the outcomes back in request order.
+    order = [i for c in range(concurrency) for i in range(c, len(paths), concurrency)]
+    ordered = [None] * len(paths)
+    for i, outcome in zip(order, outcomes):
+        ordered[i] = outcome
+
+    times = sorted(outcome[0] for outcome in ordered)
+    statuses = {}
+    for outcome in ordered:
+        statuses[outcome[1]] = statuses.get(outcome[1], 0) + 1
+
+    return {'phase': name,
+            'requests': len(paths),
+            'rps': len(paths) / elapsed,
+            'p50': _percentile(times, 50),
+            'p90': _percentile(times, 90),
+            'p99': _percentile(times, 99),
+            'mean': statistics.fmean(times),
+            'bytes': sum(outcome[2] for outcome in ordered),
+            'statuses': statuses,
+            'tags': [outcome[3] for outcome in ordered]}
+
+
+def _client(port, chunk):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    outcomes = []
+
+    for path, tag in chunk:
+        start = time.perf_counter()
+        status, headers, content = _get(connection, path, {'If-None-Match': tag} if tag else {})
+        outcomes.append(((time.perf_counter() - start) * 1e3, status, len(content), headers.get('ETag')))
+
+    connection.close()
+
+    return outcomes
+
+
+def _get(connection, path, headers=None):
+    connection.request('GET', path, headers=headers or {})
+    response = connection.getresponse()
+
+    return response.status, dict(response.getheaders()), response.read()
+
+
+def _percentile(times, percent):
+    return times[min(len(times) - 1, int(len(times) * percent / 100))]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait(port, timeout=60):
+    # The server loads the data before it listens.
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+
+    raise RuntimeError(f'API did not start on port {port}')
+
+
+if __name__ == '__main__':
+    main()
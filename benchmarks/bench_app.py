@@ -0,0 +1,315 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Run from the repository root so the workbooks are found.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import cube
+import data
+import figures
+import geometry
+import ingest
+import main as app
+import models
+import regression
+import summary
+
+# Where results are written by default.
+RESULTS_DIR = os.path.join('benchmarks', 'results')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the data loaders and figure builders of main.py.')
+    parser.add_argument('--cold-samples', type=int, default=0,
+                        help='cold calls per loader, each with empty in-memory caches, 0 for every widget combination')
+    parser.add_argument('--figure-samples', type=int, default=0,
+                        help='widget combinations per figure builder, 0 for all of them')
+    parser.add_argument('--output', help='JSON file for the results')
+    parser.add_argument('--compare', help='earlier JSON results to compare against')
+    args = parser.parse_args()
+
+    results = []
+
+    # Loaders with empty disk and memory caches, i.e. parsing the workbooks.
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache, ingest.CACHE_DIR = ingest.CACHE_DIR, cache_dir
+        for name, loader, combos in _loaders():
+            results.append(_run(name, 'loader', 'parse', _unwrap(loader), combos[:1], clear=True))
+        ingest.CACHE_DIR = cache
+
+    # Loaders with the Parquet cache on disk but nothing in memory.
+    for name, loader, combos in _loaders():
+        samples = combos if args.cold_samples == 0 else _sample(combos, args.cold_samples)
+        results.append(_run(name, 'loader', 'cold', _unwrap(loader), samples, clear=True))
+
+    # Loaders through the app's cache across every widget combination.
+    for name, loader, combos in _loaders():
+        loader(*combos[0])
+        results.append(_run(name, 'loader', 'warm', loader, combos))
+
+    # Figure builders, including serialization to the JSON sent to the browser.
+    for name, builder, combos in _figures():
+        builder(*combos[0])
+        samples = combos if args.figure_samples == 0 else _sample(combos, args.figure_samples)
+        results.append(_run(name, 'figure', 'warm', builder, samples))
+
+    report = {'commit': _commit(),
+              'date': datetime.datetime.now().isoformat(timespec='seconds'),
+              'python': platform.python_version(),
+              'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+              'results': results}
+
+    _print(results)
+
+    # Save results.
+    output = args.output or os.path.join(RESULTS_DIR, f'bench_app-{report["commit"][:12]}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nResults written to {output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            _compare(json.load(f), report)
+
+
+def _loaders():
+    # Every loader of main.py with every widget combination of its dataset section.
+    loaders = []
+    for config in app.DATASETS.values():
+        grid = _grid(config)
+
+        for kind in ('choro_us', 'choro_dmv', 'line'):
+            loaders.append((config['loaders'][kind].__name__, config['loaders'][kind],
+                            [app.series_args(sector, provider) + tuple(year) for sector, provider, *year in grid[kind]]))
+
+        loaders.append((config['loaders']['scatter'].__name__, config['loaders']['scatter'],
+                        [app.series_args(sector, provider) + (state,) for sector, provider, state in grid['series']]))
+        loaders.append((f'get_choro_panel_df {config["metric"]}', app.get_choro_panel_df,
+                        [(config['metric'], sector, provider or data.ALL_PROVIDERS, dmv)
+                         for sector, provider, dmv in grid['animated']]))
+
+    # Fitted models behind the scatter and forecast figures, and the regression diagnostics.
+    series = [(config['metric'], sector, provider or data.ALL_PROVIDERS, state)
+              for config in app.DATASETS.values() for sector, provider, state in _grid(config)['series']]
+    loaders.append(('models.params', models.params, [(model,) + key for model in models.MODELS for key in series]))
+    loaders.append(('regression.coefficients', regression.coefficients, series))
+
+    return loaders
+
+
+def _grid(config):
+    # Widget values of one dataset section: sector and provider, then year, DMV or state.
+    years = [int(year) for year in cube.load_cube(config['metric']).years]
+    series = [(sector, provider) for sector in config['sectors'] for provider in config['providers'] or (None,)]
+
+    return {'choro_us': [(sector, provider, year) for sector, provider in series for year in years],
+            'choro_dmv': [(sector, provider, year) for sector, provider in series for year in years],
+            'line': series,
+            'animated': [(sector, provider, dmv) for sector, provider in series for dmv in (False, True)],
+            'series': [(sector, provider, state) for sector, provider in series for state in app.SCATTER_STATES]}
+
+
+def _figures():
+    # Every figure of main.py, built from the same loaders with the same arguments.
+    builders = []
+    for config in app.DATASETS.values():
+        builders += _dataset_figures(config)
+
+    return builders
+
+
+def _dataset_figures(config):
+    grid = _grid(config)
+    loaders = config['loaders']
+    first, last = app.year_range(config)
+
+    # Default of the horizon slider.
+    horizon = max(2030, last + 1)
+
+    def choropleth(sector, provider, year, dmv):
+        region = 'DMV' if dmv else 'U.S.'
+        df = loaders['choro_dmv' if dmv else 'choro_us'](*app.series_args(sector, provider), year)
+
+        return figures.choropleth(df=df,
+                                  title=f'{config["title"]} {region} {app.describe(sector, provider)} {year}',
+                                  label=config['unit'],
+                                  dmv=dmv,
+                                  color_continuous_scale=config['scale'],
+                                  geojson=geometry.url(dmv)).to_json()
+
+    def animated_choropleth(sector, provider, dmv):
+        region = 'DMV' if dmv else 'U.S.'
+        df = app.get_choro_panel_df(config['metric'], sector, provider or data.ALL_PROVIDERS, dmv)
+        period = f'{df.columns[0]}-{df.columns[-1]}'
+
+        return figures.animated_choropleth(df=df,
+                                           title=f'{config["title"]} {region} {app.describe(sector, provider)} '
+                                                 f'{period}',
+                                           label=config['unit'],
+                                           dmv=dmv,
+                                           color_continuous_scale=config['scale'],
+                                           geojson=geometry.url(dmv)).to_json()
+
+    def line(sector, provider):
+        return figures.line(df=loaders['line'](*app.series_args(sector, provider)),
+                            title=f'{config["title"]} DMV {app.describe(sector, provider)} {first}-{last}',
+                            label=config['axis']).to_json()
+
+    def scatter(model, sector, provider, state):
+        df = loaders['scatter'](*app.series_args(sector, provider), state)
+        results = models.params(model, config['metric'], sector, provider or data.ALL_PROVIDERS, state)
+
+        return figures.scatter(df=df,
+                               title=f'{config["title"]} {state} {app.describe(sector, provider)} {first}-{last}',
+                               label=config['axis'],
+                               fitted=models.fitted(model, df['Year'], df['value'], results),
+                               name=f'{models.MODELS[model]["label"]} fit').to_json()
+
+    def forecast(model, sector, provider, state):
+        df = loaders['scatter'](*app.series_args(sector, provider), state)
+        results = models.params(model, config['metric'], sector, provider or data.ALL_PROVIDERS, state)
+        forecast_df = models.forecast(model=model,
+                                      results=results,
+                                      years=range(last + 1, horizon + 1)).reset_index()
+
+        return figures.forecast(df=df,
+                                forecast_df=forecast_df,
+                                title=f'Forecast {config["title"]} {state} {app.describe(sector, provider)} '
+                                      f'{first}-{horizon}',
+                                label=config['axis'],
+                                band=models.MODELS[model]['band']).to_json()
+
+    metric = config['metric']
+    fits = [(model,) + key for model in models.MODELS for key in grid['series']]
+
+    return [(f'choropleth us {metric}', lambda *combo: choropleth(*combo, dmv=False), grid['choro_us']),
+            (f'choropleth dmv {metric}', lambda *combo: choropleth(*combo, dmv=True), grid['choro_dmv']),
+            (f'animated choropleth {metric}', animated_choropleth, grid['animated']),
+            (f'line {metric}', line, grid['line']),
+            (f'scatter {metric}', scatter, fits),
+            (f'forecast {metric}', forecast, fits)]
+
+
+def _run(name, kind, phase, function, combos, clear=False):
+    times = []
+
+    # Time without tracing, tracemalloc slows every allocation down.
+    for combo in combos:
+        if clear:
+            _clear_memory_caches()
+
+        start = time.perf_counter()
+        function(*combo)
+        times.append(time.perf_counter() - start)
+
+    # Trace memory on a few of the combinations.
+    peak = 0
+    for combo in _sample(combos, 1 if clear else 10):
+        if clear:
+            _clear_memory_caches()
+
+        tracemalloc.start()
+        function(*combo)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {'name': name,
+            'kind': kind,
+            'phase': phase,
+            'count': len(times),
+            'mean_ms': statistics.fmean(times) * 1e3,
+            'p50_ms': _percentile(times, 50) * 1e3,
+            'p90_ms': _percentile(times, 90) * 1e3,
+            'p99_ms': _percentile(times, 99) * 1e3,
+            'max_ms': max(times) * 1e3,
+            'peak_bytes': peak}
+
+
+def _clear_memory_caches():
+    # Forget everything this process has loaded.
+    ingest._hashes.clear()
+    data.STORE.cache_clear()
+    cube._build_cube.cache_clear()
+    regression.TABLE.cache_clear()
+    models.TABLE.cache_clear()
+    summary.TABLE.cache_clear()
+
+
+def _unwrap(loader):
+    # The loader without the app's cache or profiling in front of it.
+    while hasattr(loader, '__wrapped__'):
+        loader = loader.__wrapped__
+
+    return loader
+
+
+def _sample(combos, count):
+    # Evenly spaced combinations.
+    if count >= len(combos):
+        return combos
+
+    step = len(combos) / count
+    return [combos[int(i * step)] for i in range(count)]
+
+
+def _percentile(times, percent):
+    if len(times) == 1:
+        return times[0]
+
+    return statistics.quantiles(times, n=100, method='inclusive')[percent - 1]
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _print(results):
+    print(f'{"name":<32}{"kind":<8}{"phase":<7}{"n":>6}{"p50 ms":>10}{"p90 ms":>10}{"p99 ms":>10}'
+          f'{"peak KiB":>11}')
+
+    for result in results:
+        print(f'{result["name"]:<32}{result["kind"]:<8}{result["phase"]:<7}{result["count"]:>6}'
+              f'{result["p50_ms"]:>10.3f}{result["p90_ms"]:>10.3f}{result["p99_ms"]:>10.3f}'
+              f'{result["peak_bytes"] / 1024:>11.1f}')
+
+
+def _compare(baseline, report):
+    # Match results by name, kind and phase.
+    before = {(result['name'], result['kind'], result['phase']): result for result in baseline['results']}
+
+    print(f'\nCompared with {baseline["commit"][:12]} (ratio > 1 is slower)')
+    print(f'{"name":<32}{"kind":<8}{"phase":<7}{"p50 ratio":>11}{"p90 ratio":>11}{"peak ratio":>12}')
+
+    for result in report['results']:
+        old = before.get((result['name'], result['kind'], result['phase']))
+        if old is None:
+            continue
+
+        print(f'{result["name"]:<32}{result["kind"]:<8}{result["phase"]:<7}'
+              f'{_ratio(result["p50_ms"], old["p50_ms"]):>11.2f}{_ratio(result["p90_ms"], old["p90_ms"]):>11.2f}'
+              f'{_ratio(result["peak_bytes"], old["peak_bytes"]):>12.2f}')
+
+
+def _ratio(new, old):
+    return new / old if old else float('nan')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Run from the repository root so the workbooks are found.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import backtest
+import cube
+import data
+import models
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the rolling-origin backtest of every model as the number of '
+                                                 'series grows.')
+    parser.add_argument('--counts', type=int, nargs='+', default=[25, 50, 100, 200, 400, 800],
+                        help='series per run, every series is always added')
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}),
+                        help='worker processes per run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='JSON file for the results')
+    args = parser.parse_args()
+
+    # Data loading is not part of the backtest.
+    data.warm_up()
+    series = _series()
+    rng = random.Random(args.seed)
+
+    results = []
+    for count in sorted({count for count in args.counts if count < len(series)} | {len(series)}):
+        sample = pd.MultiIndex.from_tuples(rng.sample(series, count), names=models.INDEX[1:])
+
+        for workers in args.workers:
+            start = time.perf_counter()
+            backtest.run(series=sample, max_workers=workers)
+            seconds = time.perf_counter() - start
+
+            results.append({'series': count,
+                            'workers': workers,
+                            'seconds': seconds})
+            print(f'{count:>6} series {workers:>3} workers {seconds:>8.2f} s '
+                  f'{seconds / count * 1e3:>8.1f} ms/series', flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+def _series():
+    # Series with enough years to be scored, from both datasets.
+    series = []
+    for metric in data.METRICS:
+        years, rows, labels = cube.rows(metric)
+        keep = (~np.isnan(rows)).sum(axis=1) > backtest.MIN_YEARS
+        series += [label for label, kept in zip(labels, keep) if kept]
+
+    return series
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import itertools
+import os
+import statistics
+import sys
+import time
+
+# Run from the repository root so the workbooks are found.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import cube
+import data
+import ingest
+
+
+def main():
+    # Raw price sheet, filtered the way the loaders used to.
+    price = ingest.read_excel(io=data.PRICE_WORKBOOK,
+                              sheet_name='Price',
+                              header=1)
+
+    price_cube = cube.load_cube(data.PRICE)
+
+    # Every choropleth combination.
+    combos = list(itertools.product(data.PRICE_SECTORS, data.PRICE_PROVIDERS, range(1990, 2021)))
+
+    def pandas_choropleth(sector, provider, year):
+        df = price[price['Year'] == year]
+        df = df[df['Industry Sector Category'] == provider]
+        return df[['Year', 'State', 'Industry Sector Category', sector]]
+
+    def pandas_line(sector, provider, year):
+        df = price[price['Industry Sector Category'] == provider]
+        df = df[['Year', 'State', 'Industry Sector Category', sector]]
+        df = df[df['State'].isin(data.DMV)]
+        return df[(df['Year'] >= 1990) & (df['Year'] <= year)]
+
+    def cube_choropleth(sector, provider, year):
+        return price_cube.frame(sector, provider, year)
+
+    def cube_line(sector, provider, year):
+        return price_cube.values[[price_cube.state_index[state] for state in data.DMV],
+                                 price_cube.sector_index[sector],
+                                 price_cube.provider_index[provider],
+                                 price_cube.year_slice((1990, year))]
+
+    def cube_choropleth_df(sector, provider, year):
+        return price_cube.choropleth_df(sector=sector, provider=provider, year=year)
+
+    def cube_line_df(sector, provider, year):
+        return price_cube.line_df(sector=sector, provider=provider, states=data.DMV, years=(1990, year))
+
+    cases = [('pandas filters', pandas_choropleth, pandas_line),
+             ('cube view', cube_choropleth, cube_line),
+             ('cube DataFrame', cube_choropleth_df, cube_line_df)]
+
+    print(f'{len(combos)} (sector, provider, year) combinations, latency in microseconds')
+    print(f'{"method":<16}{"choropleth p50":>16}{"p95":>10}{"line p50":>12}{"p95":>10}')
+
+    for name, choropleth, line in cases:
+        choropleth_times = _time(choropleth, combos)
+        line_times = _time(line, combos)
+
+        print(f'{name:<16}{_percentile(choropleth_times, 50):>16.1f}{_percentile(choropleth_times, 95):>10.1f}'
+              f'{_percentile(line_times, 50):>12.1f}{_percentile(line_times, 95):>10.1f}')
+
+
+def _time(function, combos):
+    times = []
+
+    for combo in combos:
+        start = time.perf_counter()
+        function(*combo)
+        times.append((time.perf_counter() - start) * 1e6)
+
+    return times
+
+
+def _percentile(times, percent):
+    return statistics.quantiles(times, n=100)[percent - 1]
+
+
+if __name__ == '__main__':
+    main()
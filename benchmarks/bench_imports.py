@@ -0,0 +1,76 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Run from the repository root so the app modules are found.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+
+# One line of python -X importtime: self and cumulative microseconds, then the module indented by depth.
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report the import time of an app module and of the modules it '
+                                                 'pulls in, from python -X importtime in fresh interpreters.')
+    parser.add_argument('module', nargs='?', default='main', help='module to import, the Streamlit app by default')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters, the median is reported')
+    parser.add_argument('--top', type=int, default=15, help='modules listed by cumulative and by self time')
+    parser.add_argument('--output', help='JSON file for the results')
+    args = parser.parse_args()
+
+    runs = [_run(args.module) for _ in range(args.repeat)]
+
+    # Median over the runs of every module seen in all of them.
+    modules = {}
+    for name in runs[0]:
+        if all(name in run for run in runs):
+            modules[name] = {'self': statistics.median(run[name]['self'] for run in runs),
+                             'cumulative': statistics.median(run[name]['cumulative'] for run in runs),
+                             'depth': runs[0][name]['depth']}
+
+    total = modules[args.module]['cumulative']
+    print(f'import {args.module}: {total / 1e3:.1f} ms, median of {args.repeat}')
+
+    # What the module imports directly, the app's own modules and the packages they bring in.
+    children = {name: module for name, module in modules.items() if module['depth'] == 1}
+    _print('direct imports by cumulative time', children, 'cumulative', args.top, total)
+    _print('modules by self time', modules, 'self', args.top, total)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'module': args.module, 'repeat': args.repeat, 'modules': modules}, f, indent=2)
+
+
+def _run(module):
+    # Modules already imported by the interpreter itself are not reported, a fresh one is needed each time.
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, check=True)
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            # Depth 0 is the module itself, the report indents every level by two spaces.
+            modules[name] = {'self': int(self_us),
+                             'cumulative': int(cumulative_us),
+                             'depth': (len(indent) - 1) // 2}
+
+    return modules
+
+
+def _print(title, modules, key, top, total):
+    print(f'\n{title}')
+    print(f'{"module":<48} {"ms":>8} {"share":>6}')
+
+    for name, module in sorted(modules.items(), key=lambda item: -item[1][key])[:top]:
+        print(f'{name:<48} {module[key] / 1e3:>8.1f} {module[key] / total:>6.0%}')
+
+
+if __name__ == '__main__':
+    main()
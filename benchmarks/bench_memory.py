@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import resource
+import sys
+
+import numpy as np
+
+# Run from the repository root so the workbooks are found.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import cube
+import data
+import ingest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report bytes per dataset with default and compact dtypes.')
+    parser.add_argument('--output', help='JSON file for the report')
+    args = parser.parse_args()
+
+    rows = []
+
+    # Sheets as parsed, one column per year or per sector.
+    sheets = {data.CONSUMPTION: [ingest.read_excel(io=data.CONSUMPTION_WORKBOOK, sheet_name=sector, header=2)
+                                 for sector in data.CONSUMPTION_SECTORS],
+              data.PRICE: [ingest.read_excel(io=data.PRICE_WORKBOOK, sheet_name='Price', header=1)]}
+    for metric, frames in sheets.items():
+        rows.append(_row(metric, 'sheets', sum(_bytes(df) for df in frames), None))
+
+    # Tidy frames from the loaders, against the same frames with default dtypes.
+    tidy = {data.CONSUMPTION: data._load_consumption(),
+            data.PRICE: data._load_price()}
+    for metric, df in tidy.items():
+        rows.append(_row(metric, 'tidy', _bytes(_expand(df)), _bytes(df)))
+
+    # What stays resident: the store and the cubes. The store index already encodes its labels.
+    store = data.load_store()
+    rows.append(_row('all', 'store', _bytes(_expand(store.reset_index()).set_index(data.INDEX)), _bytes(store)))
+
+    for metric in data.METRICS:
+        values = cube.load_cube(metric).values
+        rows.append(_row(metric, 'cube', values.size * np.dtype('float64').itemsize, values.nbytes))
+
+    resident = [row for row in rows if row['kind'] in ('store', 'cube')]
+    rows.append(_row('all', 'resident', sum(row['before'] for row in resident), sum(row['after'] for row in resident)))
+
+    report = {'rows': rows,
+              'max_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}
+
+    _print(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+def _expand(df):
+    # The same frame with the dtypes read_excel gives: strings, int64 years and float64 values.
+    df = df.copy()
+
+    for column in data.LABELS:
+        if column in df:
+            df[column] = df[column].astype(str)
+
+    df['Year'] = df['Year'].astype('int64')
+    df['value'] = data.widen(df['value'])
+
+    return df
+
+
+def _bytes(df):
+    # Values and index, strings included.
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _row(dataset, kind, before, after):
+    return {'dataset': dataset,
+            'kind': kind,
+            'before': before,
+            'after': after,
+            'ratio': None if after is None else before / after}
+
+
+def _print(report):
+    print(f'{"dataset":<12} {"kind":<9} {"before KiB":>11} {"after KiB":>10} {"ratio":>6}')
+
+    for row in report['rows']:
+        after = '' if row['after'] is None else f'{row["after"] / 1024:.1f}'
+        ratio = '' if row['ratio'] is None else f'{row["ratio"]:.1f}x'
+        print(f'{row["dataset"]:<12} {row["kind"]:<9} {row["before"] / 1024:>11.1f} {after:>10} {ratio:>6}')
+
+    print(f'max RSS {report["max_rss"] / 2 ** 20:.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
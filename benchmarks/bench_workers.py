@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Run from the repository root so the workbooks are found.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Start several app workers at once on one cache directory and time '
+                                                 'how long each takes to get the data and models it serves.')
+    parser.add_argument('--workers', type=int, default=4, help='worker processes started together')
+    parser.add_argument('--output', help='JSON file for the results')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child()
+        return
+
+    cache_dir = tempfile.mkdtemp(prefix='bench_workers-')
+    try:
+        # Empty cache: one worker parses and builds, the others wait and map its files.
+        results = [_phase('cold', args.workers, cache_dir)]
+
+        # Restarted workers only map the files.
+        results.append(_phase('warm', args.workers, cache_dir))
+    finally:
+        shutil.rmtree(cache_dir)
+
+    print(f'{"phase":<6} {"worker":>6} {"import s":>9} {"load s":>7} {"sheets parsed":>14} {"max RSS MiB":>12}')
+    for result in results:
+        for i, worker in enumerate(result['workers']):
+            print(f'{result["phase"]:<6} {i:>6} {worker["imports"]:>9.2f} {worker["seconds"]:>7.2f} '
+                  f'{worker["parsed"]:>14} {worker["max_rss"] / 2 ** 20:>12.1f}')
+        print(f'{result["phase"]:<6} {"all":>6} {"":>9} {result["seconds"]:>7.2f}')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+def _phase(name, workers, cache_dir):
+    env = dict(os.environ, DMV_CACHE_DIR=cache_dir)
+
+    start = time.perf_counter()
+    processes = [subprocess.Popen([sys.executable, __file__, '--child'], env=env, stdout=subprocess.PIPE)
+                 for _ in range(workers)]
+    outcomes = [json.loads(process.communicate()[0]) for process in processes]
+
+    return {'phase': name,
+            'seconds': time.perf_counter() - start,
+            'workers': outcomes}
+
+
+def _child():
+    import pandas as pd
+
+    # Count the sheets this worker parses itself.
+    parsed = []
+    read_excel = pd.read_excel
+
+    def counted(*args, **kwargs):
+        parsed.append(kwargs.get('sheet_name'))
+        return read_excel(*args, **kwargs)
+
+    pd.read_excel = counted
+
+    start = time.perf_counter()
+
+    import cube
+    import data
+    import models
+    import regression
+    import summary
+
+    imports = time.perf_counter() - start
+    start = time.perf_counter()
+
+    # What the app loads on the first rerun.
+    for metric in data.METRICS:
+        cube.load_cube(metric)
+    regression.load_coefficients()
+    summary.load_summary()
+    models.load_fits()
+
+    json.dump({'imports': imports,
+               'seconds': time.perf_counter() - start,
+               'parsed': len(parsed),
+               'max_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024},
+              sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+import collections
+import functools
+import threading
+import time
+
+# Entries kept per function unless told otherwise.
+MAX_ENTRIES = 128
+
+# Seconds an entry stays valid unless told otherwise, None keeps it until evicted.
+TTL = 3600
+
+# Every cache created, to report their counters together.
+_caches = []
+
+
+class BoundedCache:
+    # Least recently used cache with a size limit and expiry for one function.
+    #
+    # Results are handed out as is, without a copy, so callers must treat them as read-only.
+    #
+    # An optional version function is called on every lookup and is part of the key, e.g. a hash of the source data,
+    # so results of older data are never handed out and age out of the cache.
+
+    def __init__(self, function, max_entries=MAX_ENTRIES, ttl=TTL, version=None):
+        self.function = function
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = version
+
+        # Key to (expiry time, result), oldest use first.
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+        # Counters.
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        functools.update_wrapper(self, function)
+
+    def __call__(self, *args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        if self.version is not None:
+            key = (self.version(),) + key
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None:
+                expires, result = entry
+
+                if expires is None or expires > now:
+                    # Mark as most recently used.
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+
+                    return result
+
+                # Drop the expired entry.
+                del self.entries[key]
+                self.expirations += 1
+
+            self.misses += 1
+
+        # Compute outside the lock so other keys are not blocked.
+        result = self.function(*args, **kwargs)
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+
+        with self.lock:
+            self.entries[key] = (expires, result)
+            self.entries.move_to_end(key)
+
+            # Evict least recently used entries over the limit.
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+        return result
+
+    def cache_info(self):
+        with self.lock:
+            return {'name': self.function.__name__,
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'expirations': self.expirations,
+                    'entries': len(self.entries),
+                    'max_entries': self.max_entries,
+                    'ttl': self.ttl}
+
+    def cache_clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+
+def bounded_cache(max_entries=MAX_ENTRIES, ttl=TTL, version=None):
+    def decorator(function):
+        cache = BoundedCache(function=function,
+                             max_entries=max_entries,
+                             ttl=ttl,
+                             version=version)
+        _caches.append(cache)
+
+        return cache
+
+    return decorator
+
+
+def stats():
+    # Counters of every cache.
+    return [cache.cache_info() for cache in _caches]
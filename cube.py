@@ -0,0 +1,169 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+import data
+import ingest
+
+
+class Cube:
+    # Dense state x sector x provider x year array of one metric.
+
+    def __init__(self, metric, values, states, sectors, providers, years):
+        self.metric = metric
+        self.values = values
+        self.states = states
+        self.sectors = sectors
+        self.providers = providers
+        self.years = years
+
+        # Label to position lookups.
+        self.state_index = {label: i for i, label in enumerate(states)}
+        self.sector_index = {label: i for i, label in enumerate(sectors)}
+        self.provider_index = {label: i for i, label in enumerate(providers)}
+        self.year_index = {label: i for i, label in enumerate(years)}
+
+        # The 50 states and DC, the national total would stretch the color scale of a map.
+        self.map_states = [label for label in states if label != data.US]
+
+    def frame(self, sector, provider, year):
+        # Values of every state for one year.
+        return self.values[:, self.sector_index[sector], self.provider_index[provider], self.year_index[year]]
+
+    def year_slice(self, years):
+        # Positions covering an inclusive year range.
+        start = np.searchsorted(self.years, years[0], side='left')
+        stop = np.searchsorted(self.years, years[1], side='right')
+
+        return slice(start, stop)
+
+    def choropleth_df(self, sector, provider, year, states=None):
+        # Empty frame when the year is not in the data.
+        if year not in self.year_index:
+            return self._df(states=[], years=[], values=[], sector=sector, provider=provider)
+
+        # Keep only the requested states, every state of the map by default.
+        states = self.map_states if states is None else states
+        rows = [self.state_index[state] for state in states if state in self.state_index]
+        values = self.frame(sector, provider, year)[rows]
+        labels = [self.states[row] for row in rows]
+
+        # Drop states without a value that year.
+        keep = ~np.isnan(values)
+
+        return self._df(states=np.asarray(labels, dtype=object)[keep],
+                        years=np.full(keep.sum(), year),
+                        values=values[keep],
+                        sector=sector,
+                        provider=provider)
+
+    def panel_df(self, sector, provider, states=None):
+        # Every year of every state of the map, one column per year.
+        states = self.map_states if states is None else states
+        rows = [self.state_index[state] for state in states if state in self.state_index]
+        values = self.values[rows, self.sector_index[sector], self.provider_index[provider], :]
+        labels = [self.states[row] for row in rows]
+
+        df = pd.DataFrame(data=data.widen(values),
+                          index=pd.Index(labels, name='State'),
+                          columns=self.years)
+
+        # Drop states and years without any value.
+        return df.dropna(axis=0, how='all').dropna(axis=1, how='all')
+
+    def line_df(self, sector, provider, states, years=None):
+        # Year positions to keep.
+        columns = slice(None) if years is None else self.year_slice(years)
+        labels = self.years[columns]
+
+        rows = [self.state_index[state] for state in states if state in self.state_index]
+
+        # One block of years per state.
+        values = self.values[rows, self.sector_index[sector], self.provider_index[provider], columns]
+
+        # Drop years without a value.
+        keep = ~np.isnan(values).ravel()
+
+        return self._df(states=np.repeat([self.states[row] for row in rows], len(labels))[keep],
+                        years=np.tile(labels, len(rows))[keep],
+                        values=values.ravel()[keep],
+                        sector=sector,
+                        provider=provider)
+
+    @staticmethod
+    def _df(states, years, values, sector, provider):
+        # Labels as columns for plotting, one row per state and year.
+        return pd.DataFrame({'State': states,
+                             'Year': np.asarray(years, dtype='int64'),
+                             'Sector': sector,
+                             'Provider': provider,
+                             'value': data.widen(values)})
+
+
+def load_cube(metric):
+    # Rebuild the cube only when one of the workbooks changes.
+    return _build_cube(metric, *data.fingerprint())
+
+
+@functools.lru_cache(maxsize=None)
+def _build_cube(metric, consumption_hash, price_hash):
+    # Mapped from the file any server worker saved for these workbooks, built by one of them otherwise.
+    values, labels = ingest.shared_array(f'cube-{metric}', (consumption_hash, price_hash), lambda: _dense(metric))
+
+    return Cube(metric=metric,
+                values=values,
+                states=labels['states'],
+                sectors=labels['sectors'],
+                providers=labels['providers'],
+                years=np.asarray(labels['years'], dtype='int64'))
+
+
+def rows(metric, series=None):
+    # Years, then one row of values per sector, provider and state of the metric with its labels.
+    values = load_cube(metric)
+
+    shape = values.values.shape
+    rows = data.widen(values.values.transpose(1, 2, 0, 3).reshape(-1, shape[3]))
+    labels = pd.MultiIndex.from_product([[metric], values.sectors, values.providers, values.states],
+                                        names=data.INDEX[:-1])
+
+    # Only the requested (metric, sector, provider, state) series.
+    if series is not None:
+        keep = labels.isin(series)
+        rows = rows[keep]
+        labels = labels[keep]
+
+    return np.asarray(values.years, dtype='float64'), rows, labels
+
+
+def _dense(metric):
+    # Rows of the metric.
+    df = data.load_store().loc[metric]
+
+    # Labels of each axis.
+    index = df.index
+    states = np.sort(index.get_level_values('State').unique())
+    sectors = _ordered(index.get_level_values('Sector').unique(), data.CONSUMPTION_SECTORS + data.PRICE_SECTORS)
+    providers = _ordered(index.get_level_values('Provider').unique(), (data.ALL_PROVIDERS,) + data.PRICE_PROVIDERS)
+    years = np.arange(index.get_level_values('Year').min(), index.get_level_values('Year').max() + 1)
+
+    # Position of every row along each axis.
+    codes = [pd.Index(labels).get_indexer(index.get_level_values(name))
+             for name, labels in (('State', states), ('Sector', sectors), ('Provider', providers), ('Year', years))]
+
+    # Scatter the values into a dense array, missing cells stay NaN, float32 when it loses nothing.
+    values = np.full((len(states), len(sectors), len(providers), len(years)), np.nan)
+    values[tuple(codes)] = df['value'].to_numpy()
+    values = data.compact_values(values)
+
+    # The mapped copy is read-only, slices handed out are views that callers cannot write through.
+    return values, {'states': list(states),
+                    'sectors': list(sectors),
+                    'providers': list(providers),
+                    'years': [int(year) for year in years]}
+
+
+def _ordered(labels, order):
+    # Keep the display order of the known labels.
+    return [label for label in order if label in set(labels)] + sorted(set(labels) - set(order))
@@ -0,0 +1,274 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import ingest
+
+# Source workbooks.
+CONSUMPTION_WORKBOOK = r'use_tot_sector.xlsx'
+PRICE_WORKBOOK = r'avgprice_annual.xlsx'
+
+# Metric names used in the store.
+CONSUMPTION = 'consumption'
+PRICE = 'price'
+EXPENDITURE = 'expenditure'
+
+# Every metric in the store, expenditure is derived from the other two.
+METRICS = (CONSUMPTION, PRICE, EXPENDITURE)
+
+# Workbook of each metric.
+WORKBOOKS = {CONSUMPTION: CONSUMPTION_WORKBOOK,
+             PRICE: PRICE_WORKBOOK}
+
+# Consumption sectors, one sheet each.
+CONSUMPTION_SECTORS = ('Total Consumption', 'Residential Sector', 'Commercial Sector', 'Industrial Sector',
+                       'Transportation Sector')
+
+# Price sectors, one column each.
+PRICE_SECTORS = ('Total', 'Residential', 'Commercial', 'Industrial', 'Transportation', 'Other')
+
+# Price providers.
+PRICE_PROVIDERS = ('Total Electric Industry', 'Full-Service Providers', 'Restructured Retail Service Providers',
+                   'Energy-Only Providers', 'Delivery-Only Service')
+
+# Header rows of the sheets.
+CONSUMPTION_HEADER = 2
+PRICE_SHEET = 'Price'
+PRICE_HEADER = 1
+
+# Every sheet the store is built from: workbook, sheet name and header row.
+SHEETS = ([(CONSUMPTION_WORKBOOK, sector, CONSUMPTION_HEADER) for sector in CONSUMPTION_SECTORS] +
+          [(PRICE_WORKBOOK, PRICE_SHEET, PRICE_HEADER)])
+
+# Consumption is not broken down by provider.
+ALL_PROVIDERS = 'All Providers'
+
+# Price sector of each consumption sector, expenditure series are labeled with the price sector.
+EXPENDITURE_SECTORS = {'Total Consumption': 'Total',
+                       'Residential Sector': 'Residential',
+                       'Commercial Sector': 'Commercial',
+                       'Industrial Sector': 'Industrial',
+                       'Transportation Sector': 'Transportation'}
+
+# Btu in a kWh.
+BTU_PER_KWH = 3412.14
+
+# Billion Btu times cents/kWh in million dollars.
+MILLION_DOLLARS = 1e9 / BTU_PER_KWH / 100 / 1e6
+
+# DMV states.
+DMV = ('DC', 'MD', 'VA')
+
+# National total row of every workbook, not a state of the maps.
+US = 'US'
+
+# Index of the store.
+INDEX = ['Metric', 'Sector', 'Provider', 'State', 'Year']
+
+# Labels stored as categories.
+LABELS = ['Metric', 'Sector', 'Provider', 'State']
+
+# Store saved in the cache, merged by an incremental refresh or else built by one worker for all of them.
+STORE = ingest.Table('store', INDEX, lambda: _stack())
+
+# Values are kept as float32 only when rounding them back to this many decimals gives the source values exactly.
+DECIMALS = 4
+
+
+def load_store():
+    # Rebuild the store only when one of the workbooks changes.
+    return STORE.load(fingerprint())
+
+
+def warm_up(max_workers=None, force=False):
+    # Parse every sheet missing from the cache at once, then build the store.
+    timings = ingest.warm_up(SHEETS, max_workers=max_workers, force=force)
+    load_store()
+
+    return timings
+
+
+def load_dataset(metric, workbook=None):
+    # Tidy frame of one workbook, or of another release of it.
+    if metric == CONSUMPTION:
+        return _load_consumption(workbook or CONSUMPTION_WORKBOOK)
+
+    return _load_price(workbook or PRICE_WORKBOOK)
+
+
+def diff(old, new):
+    # Rows added, changed or removed between two releases of a dataset, by store key.
+    old = old.set_index(INDEX)['value']
+    new = new.set_index(INDEX)['value']
+
+    df = pd.concat({'old': pd.Series(widen(old), index=old.index),
+                    'new': pd.Series(widen(new), index=new.index)},
+                   axis=1)
+
+    in_old = df.index.isin(old.index)
+    in_new = df.index.isin(new.index)
+    same = (df['old'] == df['new']) | (df['old'].isna() & df['new'].isna())
+
+    df['change'] = np.select([~in_old, ~in_new, ~same], ['added', 'removed', 'changed'], default='')
+
+    return df[df['change'] != ''].sort_index()
+
+
+def apply_changes(store, changes):
+    # The store with the rows of a diff added, replaced or removed.
+    kept = store[~store.index.isin(changes.index)]
+    rows = changes.loc[changes['change'] != 'removed', ['new']].rename(columns={'new': 'value'})
+
+    df = pd.concat([kept, rows]).sort_index()
+    df['value'] = compact_values(widen(df['value']))
+
+    return df
+
+
+def expenditure(store):
+    # Consumption priced at the whole industry's average electricity price, in the layout of the store.
+    usage = store.xs((CONSUMPTION, ALL_PROVIDERS), level=['Metric', 'Provider'])['value']
+    usage = usage[usage.index.get_level_values('Sector').isin(list(EXPENDITURE_SECTORS))]
+    usage = usage.rename(index=EXPENDITURE_SECTORS, level='Sector')
+    price = store.xs((PRICE, PRICE_PROVIDERS[0]), level=['Metric', 'Provider'])['value']
+
+    # Join on sector, state and year, only the years both workbooks cover are kept.
+    usage, price = usage.align(price, join='inner')
+    value = np.round(widen(usage) * widen(price) * MILLION_DOLLARS, DECIMALS)
+
+    df = pd.DataFrame({'value': value}, index=usage.index).dropna()
+    df = pd.concat({EXPENDITURE: pd.concat({ALL_PROVIDERS: df}, names=['Provider'])}, names=['Metric'])
+
+    return df.reorder_levels(INDEX).sort_index()
+
+
+def fingerprint():
+    # Hashes of the source workbooks.
+    return (ingest.file_hash(CONSUMPTION_WORKBOOK),
+            ingest.file_hash(PRICE_WORKBOOK))
+
+
+def compact_values(values):
+    # float32 when it loses nothing, float64 otherwise.
+    values = np.asarray(values, dtype='float64')
+    narrow = values.astype('float32')
+
+    if np.array_equal(np.round(narrow.astype('float64'), DECIMALS), values, equal_nan=True):
+        return narrow
+
+    return values
+
+
+def widen(values):
+    # float64 values, rounding off the digits float32 added to the source values.
+    values = np.asarray(values)
+
+    if values.dtype == np.float32:
+        return np.round(values.astype('float64'), DECIMALS)
+
+    return values.astype('float64', copy=False)
+
+
+def compact(df):
+    # Categorical labels, int16 years and float32 values where lossless.
+    for column in LABELS:
+        df[column] = df[column].astype('category')
+
+    df['Year'] = df['Year'].astype('int16')
+    df['value'] = compact_values(df['value'])
+
+    return df
+
+
+def _stack():
+    frames = [_load_consumption(), _load_price()]
+
+    # Widen float32 values exactly so both datasets share one value column.
+    for frame in frames:
+        frame['value'] = widen(frame['value'])
+
+    # Stack both datasets into one tidy table.
+    df = pd.concat(frames,
+                   ignore_index=True)
+    df['value'] = compact_values(df['value'])
+
+    # Index and sort for slicing.
+    df.set_index(keys=INDEX,
+                 inplace=True)
+
+    # Add the expenditure joined from both datasets.
+    df = pd.concat([df, expenditure(df)])
+    df['value'] = compact_values(widen(df['value']))
+    df.sort_index(inplace=True)
+
+    return df
+
+
+def _load_consumption(workbook=CONSUMPTION_WORKBOOK):
+    frames = []
+
+    for sector in CONSUMPTION_SECTORS:
+        # Read total energy consumption data.
+        df = ingest.read_excel(io=workbook,
+                               sheet_name=sector,
+                               header=CONSUMPTION_HEADER)
+
+        # Make years a column.
+        df = pd.melt(frame=df,
+                     id_vars=['State'],
+                     var_name='Year')
+
+        # Label the rows.
+        df['Metric'] = CONSUMPTION
+        df['Sector'] = sector
+        df['Provider'] = ALL_PROVIDERS
+
+        frames.append(df)
+
+    df = pd.concat(frames, ignore_index=True)
+
+    return compact(df)
+
+
+def _load_price(workbook=PRICE_WORKBOOK):
+    # Read average price data.
+    df = ingest.read_excel(io=workbook,
+                           sheet_name=PRICE_SHEET,
+                           header=PRICE_HEADER)
+
+    # Make sectors a column.
+    df = pd.melt(frame=df,
+                 id_vars=['Year', 'State', 'Industry Sector Category'],
+                 value_vars=list(PRICE_SECTORS),
+                 var_name='Sector')
+
+    # Label the rows.
+    df.rename(columns={'Industry Sector Category': 'Provider'},
+              inplace=True)
+    df['Metric'] = PRICE
+
+    return compact(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse every workbook sheet into the cache before the app starts.')
+    parser.add_argument('--workers', type=int, help='worker processes, one per sheet up to the CPU count by default')
+    parser.add_argument('--force', action='store_true', help='parse sheets that are already cached too')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    timings = warm_up(max_workers=args.workers, force=args.force)
+
+    for timing in timings:
+        print(f'{timing["workbook"]:<24} {timing["sheet"]:<24} {timing["seconds"] * 1e3:>8.1f} ms')
+
+    if not timings:
+        print('Every sheet is already cached.')
+
+    print(f'Warm-up took {(time.perf_counter() - start) * 1e3:.1f} ms.')
+
+
+if __name__ == '__main__':
+    main()
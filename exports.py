@@ -0,0 +1,57 @@
+import functools
+import gzip
+import io
+
+import streamlit as st
+
+import caching
+import data
+
+# Download formats: file extension and MIME type.
+FORMATS = {'CSV': ('csv', 'text/csv'),
+           'CSV (gzip)': ('csv.gz', 'application/gzip'),
+           'Parquet': ('parquet', 'application/vnd.apache.parquet')}
+
+
+def to_bytes(df, file_format):
+    if file_format == 'CSV':
+        return df.to_csv().encode()
+
+    if file_format == 'CSV (gzip)':
+        return gzip.compress(df.to_csv().encode())
+
+    if file_format == 'Parquet':
+        buffer = io.BytesIO()
+
+        # Parquet needs string column names.
+        df.rename(columns=str).to_parquet(buffer)
+        return buffer.getvalue()
+
+    raise ValueError(f'Unknown download format {file_format!r}')
+
+
+@caching.bounded_cache(max_entries=32, version=data.fingerprint)
+def export(loader, args, file_format):
+    # Serialize the loader's DataFrame, once per dataset, filter and format.
+    return to_bytes(loader(*args), file_format)
+
+
+def download_button(loader, args, file_name, key):
+    # Set 2 columns for the format and the button.
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Select box to choose file format.
+        file_format = st.selectbox(label='Select a file format:',
+                                   options=tuple(FORMATS),
+                                   key=f'{key}-format')
+
+    extension, mime = FORMATS[file_format]
+
+    with col2:
+        # Save raw data button, the file is only built when clicked.
+        st.download_button(label='Press to Download Raw Data',
+                           data=functools.partial(export, loader, args, file_format),
+                           file_name=f'{file_name}.{extension}',
+                           mime=mime,
+                           key=key)
@@ -0,0 +1,158 @@
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+import geometry
+
+# Plotly config of the maps, the base map is looked up next to the bundled geometry.
+MAP_CONFIG = {'topojsonURL': f'{geometry.STATIC_URL}/'}
+
+
+def choropleth(df, title, label, dmv=False, color_continuous_scale=None, geojson=None):
+    # Create choropleth map figure, the geometry is embedded unless given as a URL.
+    fig = px.choropleth(data_frame=df,
+                        geojson=geojson or geometry.load(dmv),
+                        locations='State',
+                        color='value',
+                        scope='usa',
+                        title=title,
+                        labels={'value': label},
+                        color_continuous_scale=color_continuous_scale)
+
+    return _map(fig, dmv)
+
+
+def animated_choropleth(df, title, label, dmv=False, color_continuous_scale=None, geojson=None):
+    # States in rows and years in columns, float32 keeps the frames small.
+    values = df.to_numpy(dtype='float32')
+    years = [str(year) for year in df.columns]
+
+    # One color range for every year so frames can be compared, the frame holds only states of the map.
+    zmin = float(np.nanmin(values))
+    zmax = float(np.nanmax(values))
+
+    # Base map with the first year.
+    fig = go.Figure(data=[go.Choropleth(geojson=geojson or geometry.load(dmv),
+                                        locations=df.index,
+                                        z=values[:, 0],
+                                        zmin=zmin,
+                                        zmax=zmax,
+                                        colorscale=color_continuous_scale,
+                                        colorbar={'title': {'text': label}})])
+
+    # Each frame only carries the color array, everything else stays from the base map.
+    fig.frames = [go.Frame(data=[go.Choropleth(z=values[:, i])],
+                           name=year)
+                  for i, year in enumerate(years)]
+
+    # Redraw on every frame, choropleths do not tween.
+    animation = {'mode': 'immediate',
+                 'frame': {'duration': 300, 'redraw': True},
+                 'transition': {'duration': 0}}
+
+    # Play and pause buttons.
+    fig.update_layout(title=title,
+                      geo={'scope': 'usa'},
+                      updatemenus=[{'type': 'buttons',
+                                    'showactive': False,
+                                    'x': 0,
+                                    'y': 0,
+                                    'xanchor': 'right',
+                                    'yanchor': 'top',
+                                    'buttons': [{'label': 'Play',
+                                                 'method': 'animate',
+                                                 'args': [None, {**animation, 'fromcurrent': True}]},
+                                                {'label': 'Pause',
+                                                 'method': 'animate',
+                                                 'args': [[None], animation]}]}],
+                      sliders=[{'currentvalue': {'prefix': 'Year: '},
+                                'steps': [{'label': year,
+                                           'method': 'animate',
+                                           'args': [[year], animation]}
+                                          for year in years]}])
+
+    return _map(fig, dmv)
+
+
+def _map(fig, dmv):
+    # The bundled states are the whole map, hide the base layers drawn from Plotly's own geometry.
+    fig.update_geos(visible=False,
+                    showland=False,
+                    showlakes=False,
+                    showsubunits=False)
+
+    # Zoom in on the DMV.
+    if dmv:
+        fig.update_geos(fitbounds='locations')
+
+    return fig
+
+
+def line(df, title, label):
+    # Create line plot figure.
+    fig = px.line(data_frame=df,
+                  x='Year',
+                  y='value',
+                  color='State',
+                  title=title,
+                  labels={'value': label})
+
+    # Every year is sent once, the browser narrows the range with the slider under the plot.
+    fig.update_xaxes(rangeslider_visible=True,
+                     rangeslider_thickness=0.1)
+
+    return fig
+
+
+def scatter(df, title, label, fitted, name='OLS trendline'):
+    # Create scatter plot figure.
+    fig = px.scatter(data_frame=df,
+                     x='Year',
+                     y='value',
+                     color='State',
+                     title=title,
+                     labels={'value': label})
+
+    # Add the model's values for the observed years.
+    fig.add_scatter(x=df['Year'],
+                    y=fitted,
+                    mode='lines',
+                    line_color='red',
+                    name=name,
+                    showlegend=False)
+
+    return fig
+
+
+def forecast(df, forecast_df, title, label, band='95% prediction interval'):
+    # Create forecast figure from the observed values.
+    fig = px.scatter(data_frame=df,
+                     x='Year',
+                     y='value',
+                     color='State',
+                     title=title,
+                     labels={'value': label})
+
+    # Add the forecast band.
+    fig.add_scatter(x=forecast_df['Year'],
+                    y=forecast_df['upper'],
+                    mode='lines',
+                    line_width=0,
+                    name='Upper bound',
+                    showlegend=False)
+    fig.add_scatter(x=forecast_df['Year'],
+                    y=forecast_df['lower'],
+                    mode='lines',
+                    line_width=0,
+                    fill='tonexty',
+                    fillcolor='rgba(255, 0, 0, 0.2)',
+                    name=band)
+
+    # Add the predictions.
+    fig.add_scatter(x=forecast_df['Year'],
+                    y=forecast_df['prediction'],
+                    mode='lines',
+                    line_color='red',
+                    name='Prediction')
+
+    return fig
@@ -0,0 +1,181 @@
+import argparse
+import functools
+import json
+import os
+
+import numpy as np
+
+import data
+
+# Bundled state geometry, simplified ahead of time and served by Streamlit static file serving.
+STATIC_DIR = 'static'
+STATIC_URL = 'app/static'
+STATES = 'states.geojson'
+DMV = 'dmv.geojson'
+
+# Plotly.js fetches the base map of the scope even when the states come from GeoJSON, an empty one is served instead.
+BASE_MAP = 'usa_110m.json'
+
+# Douglas-Peucker tolerance and coordinate decimals, in degrees, for the U.S. and the DMV maps.
+STATES_TOLERANCE = 0.03
+STATES_DECIMALS = 2
+DMV_TOLERANCE = 0.002
+DMV_DECIMALS = 3
+
+# Islands smaller than this many squared tolerances are dropped, the largest ring of a state is always kept.
+MIN_AREA = 4
+
+# The 50 states and DC, territories are not in the datasets.
+TERRITORIES = ('AS', 'GU', 'MP', 'PR', 'VI')
+
+
+@functools.lru_cache(maxsize=2)
+def load(dmv=False):
+    # GeoJSON feature collection with the state abbreviation as feature id.
+    with open(os.path.join(STATIC_DIR, DMV if dmv else STATES)) as f:
+        return json.load(f)
+
+
+def url(dmv=False):
+    # Relative URL of the same file, the browser fetches it once instead of with every figure.
+    return f'{STATIC_URL}/{DMV if dmv else STATES}'
+
+
+def simplify(ring, tolerance):
+    # Douglas-Peucker on a closed ring, keeps the first and last point.
+    keep = np.zeros(len(ring), dtype=bool)
+    keep[[0, -1]] = True
+
+    stack = [(0, len(ring) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        # Distance of the points in between to the chord, or to the start point when the chord is a point.
+        chord = ring[end] - ring[start]
+        offsets = ring[start + 1:end] - ring[start]
+        length = np.hypot(*chord)
+        if length:
+            distances = np.abs(chord[0] * offsets[:, 1] - chord[1] * offsets[:, 0]) / length
+        else:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack += [(start, split), (split, end)]
+
+    return ring[keep]
+
+
+def area(ring):
+    # Shoelace formula.
+    x, y = ring[:, 0], ring[:, 1]
+
+    return abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1))) / 2
+
+
+def polygons(shape):
+    # Split a shapefile shape into polygons of an exterior ring followed by its holes.
+    points = np.asarray(shape.points, dtype=float)
+    bounds = list(shape.parts) + [len(points)]
+
+    result = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        ring = points[start:end]
+
+        # Shapefile exterior rings are clockwise, holes are counterclockwise.
+        x, y = ring[:, 0], ring[:, 1]
+        clockwise = np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]) < 0
+
+        if clockwise or not result:
+            result.append([ring])
+        else:
+            result[-1].append(ring)
+
+    return result
+
+
+def feature(state, name, shape, tolerance, decimals):
+    polygons_ = polygons(shape)
+
+    # Keep the largest polygon whatever its size.
+    largest = max(polygons_, key=lambda polygon: area(polygon[0]))
+
+    coordinates = []
+    for polygon in polygons_:
+        if polygon is not largest and area(polygon[0]) < MIN_AREA * tolerance ** 2:
+            continue
+
+        rings = []
+        for ring in polygon:
+            ring = np.round(simplify(ring, tolerance), decimals)
+
+            # Drop points that collapsed onto their neighbor after rounding.
+            ring = ring[np.r_[True, np.any(np.diff(ring, axis=0) != 0, axis=1)]]
+
+            # Keep the shapefile winding, clockwise exterior rings are what d3-geo, and so plotly.js, expects.
+            if len(ring) >= 4:
+                rings.append(ring.tolist())
+
+        if rings:
+            coordinates.append(rings)
+
+    return {'type': 'Feature',
+            'id': state,
+            'properties': {'name': name},
+            'geometry': {'type': 'MultiPolygon',
+                         'coordinates': coordinates}}
+
+
+def build(shapefile_path, static_dir=STATIC_DIR):
+    # Only needed to rebuild the bundle.
+    import shapefile
+
+    reader = shapefile.Reader(shapefile_path)
+
+    states = []
+    dmv = []
+    for shape_record in reader.iterShapeRecords():
+        record = shape_record.record.as_dict()
+        state = record['STUSPS']
+
+        if state in TERRITORIES:
+            continue
+
+        states.append(feature(state, record['NAME'], shape_record.shape, STATES_TOLERANCE, STATES_DECIMALS))
+
+        # Finer geometry for the zoomed in DMV map.
+        if state in data.DMV:
+            dmv.append(feature(state, record['NAME'], shape_record.shape, DMV_TOLERANCE, DMV_DECIMALS))
+
+    os.makedirs(static_dir, exist_ok=True)
+
+    for file_name, features in ((STATES, states), (DMV, dmv)):
+        path = os.path.join(static_dir, file_name)
+        features.sort(key=lambda f: f['id'])
+
+        with open(path, 'w') as f:
+            json.dump({'type': 'FeatureCollection', 'features': features}, f, separators=(',', ':'))
+
+        points = sum(len(ring) for f in features for polygon in f['geometry']['coordinates'] for ring in polygon)
+        print(f'{path}: {len(features)} states, {points} points, {os.path.getsize(path) / 1024:.1f} KiB')
+
+    with open(os.path.join(static_dir, BASE_MAP), 'w') as f:
+        json.dump({'type': 'Topology', 'objects': {}, 'arcs': []}, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the simplified state geometry bundle from the Census '
+                                                 'cartographic boundary shapefile (cb_2016_us_state_500k.shp).')
+    parser.add_argument('shapefile')
+    parser.add_argument('--static-dir', default=STATIC_DIR)
+    args = parser.parse_args()
+
+    build(args.shapefile, args.static_dir)
+
+
+if __name__ == '__main__':
+    main()
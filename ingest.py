@@ -0,0 +1,388 @@
+import concurrent.futures
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+try:
+    import fcntl
+except ImportError:
+    # Not on Windows, there every process builds the tables it misses itself.
+    fcntl = None
+
+# Directory for the columnar copies of the workbooks.
+CACHE_DIR = os.environ.get('DMV_CACHE_DIR', '.cache')
+
+# Manifest remembering the hash of each workbook by modification time.
+MANIFEST = 'manifest.json'
+
+# Version of the derived tables, bump it when what they hold changes so saved copies are rebuilt.
+TABLE_VERSION = 5
+
+# Hashes already known to this process.
+_hashes = {}
+
+
+def read_excel(io, sheet_name, header):
+    # Get the hash of the current workbook contents.
+    digest = file_hash(io)
+
+    # Parquet copy of this sheet for this version of the workbook.
+    path = _sheet_path(io, sheet_name, header, digest)
+
+    if os.path.exists(path):
+        return _read_parquet(path)
+
+    # Parse the workbook sheet.
+    df = pd.read_excel(io=io,
+                       sheet_name=sheet_name,
+                       header=header)
+
+    # Remove copies made from older versions of the workbook.
+    _remove_stale(io, sheet_name, header, digest)
+
+    # Save sheet as Parquet.
+    _write_parquet(df, path)
+
+    return df
+
+
+def warm_up(sheets, max_workers=None, force=False):
+    # Hash the workbooks first so the workers find them in the manifest.
+    for io in {io for io, sheet_name, header in sheets}:
+        file_hash(io)
+
+    # Sheets without a Parquet copy of the current workbook.
+    if not force:
+        sheets = [sheet for sheet in sheets if not os.path.exists(_sheet_path(*sheet, file_hash(sheet[0])))]
+
+    if not sheets:
+        return []
+
+    # Parse the sheets in parallel.
+    args = [(io, sheet_name, header, CACHE_DIR, force) for io, sheet_name, header in sheets]
+    seconds = list(map_spawned(_timed_read, args, max_workers))
+
+    return [{'workbook': io, 'sheet': sheet_name, 'seconds': s}
+            for (io, sheet_name, header), s in zip(sheets, seconds)]
+
+
+def map_spawned(function, args, max_workers=None):
+    # Results of the function on every tuple of arguments, in order, from one worker process per CPU by default.
+    if not args:
+        return
+
+    max_workers = max_workers or min(len(args), os.cpu_count() or 1)
+
+    if max_workers == 1:
+        yield from (function(*arg) for arg in args)
+        return
+
+    # Spawned workers do not inherit the app's threads, many small tasks are sent in batches.
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers,
+                                                mp_context=multiprocessing.get_context('spawn')) as pool:
+        yield from pool.map(function, *zip(*args), chunksize=max(1, len(args) // (max_workers * 4)))
+
+
+def _timed_read(io, sheet_name, header, cache_dir, force):
+    global CACHE_DIR
+
+    # Workers do not see changes the parent made to the cache directory.
+    CACHE_DIR = cache_dir
+
+    if force:
+        path = _sheet_path(io, sheet_name, header, file_hash(io))
+        if os.path.exists(path):
+            os.remove(path)
+
+    # Parse into the cache, the DataFrame itself stays in the worker.
+    start = time.perf_counter()
+    read_excel(io=io,
+               sheet_name=sheet_name,
+               header=header)
+
+    return time.perf_counter() - start
+
+
+def file_hash(io):
+    # Get file size and modification time.
+    stat = os.stat(io)
+    key = os.path.abspath(io)
+
+    # Reuse the hash when the file has not been touched.
+    known = _hashes.get(key)
+    if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+        return known[2]
+
+    manifest = _read_manifest()
+    entry = manifest.get(key)
+    if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+        _hashes[key] = (stat.st_mtime_ns, stat.st_size, entry['sha256'])
+        return entry['sha256']
+
+    # Hash the file contents.
+    sha = hashlib.sha256()
+    with open(io, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+
+    # Remember the hash for the next start.
+    manifest[key] = {'mtime_ns': stat.st_mtime_ns,
+                     'size': stat.st_size,
+                     'sha256': sha.hexdigest()}
+    _write_manifest(manifest)
+    _hashes[key] = (stat.st_mtime_ns, stat.st_size, sha.hexdigest())
+
+    return sha.hexdigest()
+
+
+def read_table(name, digests):
+    # Table derived from the workbooks with these hashes, None when it has not been saved.
+    path = _table_path(name, digests)
+
+    if os.path.exists(path):
+        # Arrow IPC is mapped, not parsed, the numeric columns are views of the file whose pages every worker shares.
+        table = feather.read_table(path, memory_map=True)
+        df = pd.DataFrame({name: _column(column) for name, column in zip(table.column_names, table.columns)},
+                          copy=False)
+        df.columns = [int(column) if column.isdigit() else column for column in df.columns]
+
+        return df
+
+    return None
+
+
+def _column(column):
+    # Read-only view of a numeric column, labels and anything with nulls are decoded into the process's own memory.
+    if (column.num_chunks == 1 and column.null_count == 0 and
+            (pa.types.is_integer(column.type) or pa.types.is_floating(column.type))):
+        return column.chunk(0).to_numpy(zero_copy_only=True)
+
+    return column.to_pandas()
+
+
+def write_table(df, name, digests):
+    path = _table_path(name, digests)
+
+    # Remove tables derived from older versions of the workbooks.
+    _remove_tables(name, path)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    # Arrow IPC needs string column names, NaN stays a float instead of becoming a null so the column can be mapped.
+    table = pa.table({str(column): pa.array(df[column].to_numpy(), from_pandas=False) if df[column].dtype.kind == 'f'
+                      else pa.array(df[column]) for column in df.columns})
+
+    # Uncompressed and in one chunk so readers can map every column, written to a temporary file first so they never
+    # see a partial one.
+    tmp = f'{path}.{os.getpid()}.tmp'
+    feather.write_feather(table, tmp, compression='uncompressed', chunksize=max(len(df), 1))
+    os.replace(tmp, path)
+
+
+class Table:
+    # Table derived from the workbooks, saved in the cache directory for every worker and read once per release.
+
+    def __init__(self, name, index, build):
+        self.name = name
+        self.index = index
+        self.build = build
+
+        # Workbook hashes and frame of the release this process read last.
+        self._loaded = None
+
+    def load(self, digests):
+        # Saved for these workbooks by any process, else built by this one while the others wait to read it.
+        df = self.read(digests)
+        if df is not None:
+            return df
+
+        with lock(self.name):
+            # Another worker may have saved it while this one waited.
+            df = self.read(digests)
+            if df is None:
+                self.save(self.build(), digests)
+                df = self.read(digests)
+
+        return df
+
+    def read(self, digests):
+        # None when no process has saved it for these workbooks yet.
+        digests = tuple(digests)
+
+        if self._loaded is None or self._loaded[0] != digests:
+            df = read_table(self.name, digests)
+            if df is None:
+                return None
+
+            # Saved in index order, sorting again would copy the mapped columns.
+            self._loaded = (digests, df.set_index(self.index))
+
+        return self._loaded[1]
+
+    def save(self, df, digests):
+        # Later starts with these workbooks read it instead of building it.
+        write_table(df.sort_index().reset_index(), self.name, digests)
+        self.cache_clear()
+
+    def cache_clear(self):
+        self._loaded = None
+
+
+def read_array(name, digests):
+    # Array and its axis labels saved for these workbooks, None when they have not been saved.
+    path = _array_path(name, digests)
+
+    try:
+        with open(f'{path}.json') as f:
+            labels = json.load(f)
+
+        # A read-only view of the mapped file, the pages are shared by every worker that maps it.
+        return np.asarray(np.load(path, mmap_mode='r')), labels
+    except FileNotFoundError:
+        # Not saved yet, or removed by a newer release in between.
+        return None
+
+
+def write_array(values, labels, name, digests):
+    path = _array_path(name, digests)
+
+    # Remove arrays derived from older versions of the workbooks.
+    _remove_tables(name, path)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    # Labels first, readers only look for them once the array exists.
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(labels, f)
+    os.replace(tmp, f'{path}.json')
+
+    with open(tmp, 'wb') as f:
+        np.save(f, values)
+    os.replace(tmp, path)
+
+
+def shared_array(name, digests, build):
+    # Array saved for these workbooks by any process, else built by this one while the others wait to map it.
+    saved = read_array(name, digests)
+    if saved is not None:
+        return saved
+
+    with lock(name):
+        # Another worker may have saved it while this one waited.
+        if read_array(name, digests) is None:
+            write_array(*build(), name, digests)
+
+    return read_array(name, digests)
+
+
+@contextlib.contextmanager
+def lock(name):
+    # One process at a time builds a table, across every server worker sharing the cache directory.
+    if fcntl is None:
+        yield
+        return
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    with open(os.path.join(CACHE_DIR, f'{name}.lock'), 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _table_path(name, digests):
+    return os.path.join(CACHE_DIR, f'{name}-v{TABLE_VERSION}-{"-".join(digest[:16] for digest in digests)}.arrow')
+
+
+def _array_path(name, digests):
+    return os.path.join(CACHE_DIR, f'{name}-v{TABLE_VERSION}-{"-".join(digest[:16] for digest in digests)}.npy')
+
+
+def _remove_tables(name, path):
+    if not os.path.isdir(CACHE_DIR):
+        return
+
+    # Workers still mapping a removed file keep reading it until they move on to the new one.
+    prefix = f'{name}-'
+    current = os.path.basename(path)
+
+    for file_name in os.listdir(CACHE_DIR):
+        if (file_name.startswith(prefix) and not file_name.startswith(current) and
+                file_name.endswith(('.parquet', '.arrow', '.npy', '.npy.json'))):
+            os.remove(os.path.join(CACHE_DIR, file_name))
+
+
+def _sheet_prefix(io, sheet_name, header):
+    # File name safe version of the workbook and sheet names.
+    stem = os.path.splitext(os.path.basename(io))[0]
+    sheet = re.sub(r'[^A-Za-z0-9]+', '_', sheet_name).strip('_')
+
+    return f'{stem}-{sheet}-h{header}-'
+
+
+def _sheet_path(io, sheet_name, header, digest):
+    return os.path.join(CACHE_DIR, f'{_sheet_prefix(io, sheet_name, header)}{digest[:16]}.parquet')
+
+
+def _remove_stale(io, sheet_name, header, digest):
+    if not os.path.isdir(CACHE_DIR):
+        return
+
+    prefix = _sheet_prefix(io, sheet_name, header)
+    current = os.path.basename(_sheet_path(io, sheet_name, header, digest))
+
+    for name in os.listdir(CACHE_DIR):
+        if name.startswith(prefix) and name != current:
+            os.remove(os.path.join(CACHE_DIR, name))
+
+
+def _read_parquet(path):
+    df = pd.read_parquet(path)
+
+    # Parquet stores column names as strings, turn years back into integers.
+    df.columns = [int(column) if column.isdigit() else column for column in df.columns]
+
+    return df
+
+
+def _write_parquet(df, path):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    # Parquet needs string column names.
+    out = df.copy()
+    out.columns = [str(column) for column in out.columns]
+
+    # Write to a temporary file first so readers never see a partial file.
+    tmp = f'{path}.{os.getpid()}.tmp'
+    out.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def _read_manifest():
+    try:
+        with open(os.path.join(CACHE_DIR, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    path = os.path.join(CACHE_DIR, MANIFEST)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
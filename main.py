@@ -1,6 +1,21 @@
-import streamlit as st
-import plotly.express as px
 import pandas as pd
+import streamlit as st
+
+import backtest
+import caching
+import cube
+import data
+import exports
+import figures
+import geometry
+import models
+import profiling
+import regression
+import summary
+import warmup
+
+# Rerun a section on its own, st.fragment was called st.experimental_fragment before Streamlit 1.37.
+fragment = getattr(st, 'fragment', None) or st.experimental_fragment
 
 
 def main():
@@ -9,6 +24,17 @@ def main():
                        page_icon='💡',
                        initial_sidebar_state='expanded')
 
+    # Start timing this rerun.
+    profiling.start()
+
+    # Parse every workbook sheet missing from the cache at once, only the first run has any to parse.
+    with profiling.section('Warm-up'):
+        for timing in data.warm_up():
+            profiling.record(timing['sheet'], 'sheet', timing['seconds'])
+
+    # Load the models and the other datasets in the background, once per server process.
+    warmup.start()
+
     # Print title.
     st.title(body='💡 DMV Energy Efficiency Analysis',
              anchor='title')
@@ -32,7 +58,7 @@ def main():
 
     # Select box to choose dataset.
     visualization = st.selectbox(label='Select a dataset:',
-                                 options=('Energy Consumption', 'Energy Usage Price'))
+                                 options=tuple(DATASETS))
 
     # Table of contents.
     st.sidebar.title(body='Table of Contents')
@@ -45,7 +71,7 @@ def main():
                    - [Choropleth Map](#choropleth-map)\n
                    - [Line Plot](#line-plot)\n
                - [Machine Learning](#machine-learning)\n
-                   - [Scatter Plot with Linear Regression Model](#scatter-plot)\n
+                   - [Scatter Plot with Forecasting Model](#scatter-plot)\n
                    - [Equation](#equation)\n
                    - [Prediction](#prediction)\n
                - [Data Analysis](#data-analysis)\n
@@ -63,156 +89,201 @@ def main():
     # Header for Data Visualization.
     st.header(body='Data Visualization')
 
-    if visualization == 'Energy Consumption':
-        # Set subheader.
-        st.subheader(body='Total Energy Consumption Estimates by End-Use Sector, 1990-2019')
+    # Widgets and labels of the chosen dataset.
+    config = DATASETS[visualization]
 
-        # Write description.
-        st.write('Comprehensive state-level estimates of energy production, consumption, prices, and expenditures by '
-                 'source and sector.')
+    # Set subheader with the years in the data.
+    first, last = year_range(config)
+    st.subheader(body=f'{config["heading"]}, {first}-{last}')
 
-        # Subheader for choropleth map.
-        st.subheader(body='Choropleth Map')
+    # Write description.
+    st.write(config['description'])
 
-        # Subheader for U.S.
-        st.markdown(body='#### United States')
+    # Subheader for choropleth map.
+    st.subheader(body='Choropleth Map')
 
-        # Set 2 columns for the options.
-        col1, col2 = st.columns(2)
+    # Each section reruns on its own when one of its widgets changes.
+    choropleth_section(config, dmv=False)
+    choropleth_section(config, dmv=True)
+    line_section(config)
+    machine_learning_section(config)
 
-        with col1:
-            # Select box to choose sector.
-            sector = st.selectbox(label='Select a sector:',
-                                  options=('Total Consumption', 'Residential Sector', 'Commercial Sector',
-                                           'Industrial Sector', 'Transportation Sector'),
-                                  key='sector1')
-        with col2:
-            # Year slider.
-            year = st.slider(label='Select a year:',
-                             min_value=1960,
-                             max_value=2019,
-                             key='slider1')
+    # Print header for data analysis.
+    st.header(body='Data Analysis',
+              anchor='data-analysis')
 
-        # Get dataframe.
-        df = get_choro_us_usage_df(sector)
+    # Print analysis from the summary table.
+    analysis_section()
 
-        # Create figure.
-        fig = px.choropleth(data_frame=df,
-                            locations='State',
-                            locationmode='USA-states',
-                            color=year,
-                            scope='usa',
-                            title=f'Total Energy Consumption Estimates U.S. {sector} {year}',
-                            labels={f'{year}': 'Billion Btu'})
+    # Print header.
+    st.markdown(body='###### Insights & Findings ')
 
-        # Print choropleth map figure to page.
-        st.write(fig)
+    # Print insights.
+    st.write(""" 
+    Based on the data analysis, we can make the inference that the DMV region has experienced 
+    an increase in energy consumption and energy usage price. This means that, with the current 
+    status of energy inefficiency across the states within the DMV region, there is a need for 
+    the implementation of energy efficiency policies and programs to help improve energy efficiency in the DMV.
+    """)
 
-        # Print DataFrame.
-        file_container = st.expander(label=f'Click to display Total Energy Consumption U.S. {sector} {year} Data')
-        file_container.write(df)
+    # Print header/subheader for Recommendations.
+    st.header(body='Recommendations',
+              anchor='recommendations')
 
-        # Save raw data button to save DataFrame as CSV file.
-        st.download_button(label='Press to Download Raw Data',
-                           data=df.to_csv(),
-                           file_name=f'{sector}.csv',
-                           mime='text/csv',
-                           key='download-csv1')
+    # Print markdown
+    st.markdown(body='###### State-Level Energy Efficiency Programs')
 
-        # Subheader for DMV.
-        st.markdown(body='#### DMV')
+    # Print DMV.
+    st.write("""
+    -	MD
+    	- PEPCO - Commercial and Industrial Energy Efficiency Rebate Program
+    	- PEPCO - Residential Energy Efficiency Rebate Program
+    -	DC
+        - FirstEnergy (Potomac Edison) - Commercial and Industrial Energy Efficiency Rebate Program
+        - FirstEnergy (Potomac Edison) - Residential Energy Efficiency Rebate Program
+    -	VA
+        - Washington Gas - Commercial Energy Efficiency Rebate Program
+        - Washington Gas - Residential Energy Efficiency Rebate Program 
+    """)
 
-        # Set 2 columns for the options.
-        col1, col2 = st.columns(2)
+    # Print markdown
+    st.markdown(body='###### State-Level Energy Efficiency Policies')
 
-        with col1:
-            # Select box to choose sector.
-            sector = st.selectbox(label='Select a sector:',
-                                  options=('Total Consumption', 'Residential Sector', 'Commercial Sector',
-                                           'Industrial Sector', 'Transportation Sector'),
-                                  key='sector2')
-        with col2:
-            # Year slider.
-            year = st.slider(label='Select a year:',
-                             min_value=1960,
-                             max_value=2019,
-                             key='slider2')
+    # Print policies.
+    st.write("""
+    -	Encourage retro-commissioning when it comes to developing and building public and private buildings.
+    -	Implement state-wide energy performance building codes for the numerous commercial and residential buildings constructed or in the process of construction.
+    -	Provide educational classes and materials that help state citizens adjust their lifestyle to be more energy conscious and follow energy-efficient methods.
+    -	Implement energy efficiency standards and codes for household appliances, like washing machines and refrigerators, to encourage more energy-efficient appliances.
+    -	Monitor the state's ongoing energy consumption and cost analysis to curate energy efficiency programs and policies for the state's current energy status.
+    """)
 
-        # Get dataframe.
-        dmv_df = get_choro_dmv_usage_df(sector)
+    # Return to top link.
+    st.markdown(body='<a href="#title">Link to top</a>',
+                unsafe_allow_html=True)
 
-        # Create choropleth map figure.
-        fig = px.choropleth(data_frame=dmv_df,
-                            locations='State',
-                            locationmode='USA-states',
-                            color=year,
-                            scope='usa',
-                            title=f'Total Energy Consumption Estimates DMV {sector} {year}',
-                            labels={f'{year}': 'Billion Btu'})
+    # # Remove top right menu.
+    st.markdown(body="""
+                     <style>
+                     header {visibility: hidden;}
+                     #MainMenu {visibility: hidden;}
+                     footer {visibility: hidden;}
+                     </style>
+                     """,
+                unsafe_allow_html=True)
 
-        fig.update_geos(fitbounds='locations')
+    # Print timings to the sidebar.
+    profiling.finish(st.sidebar)
+
+
+@fragment
+def choropleth_section(config, dmv):
+    region = 'DMV' if dmv else 'U.S.'
+    number = 2 if dmv else 1
+
+    with profiling.section(f'{region} choropleth'):
+        # Subheader for the region.
+        st.markdown(body='#### DMV' if dmv else '#### United States')
+
+        # Select boxes to choose sector and provider.
+        sector, provider, column = select_series(config, number)
+
+        with column:
+            # Play every year in the browser instead of rerunning for each one.
+            animate = st.checkbox(label='Animate years',
+                                  key=f'animate{number}')
+
+            if not animate:
+                # Year slider.
+                first, last = year_range(config)
+                year = st.slider(label='Select a year:',
+                                 min_value=first,
+                                 max_value=last,
+                                 key=f'slider{number}')
+
+        if animate:
+            # Get dataframe with one column per year.
+            loader = get_choro_panel_df
+            args = (config['metric'], sector, provider or data.ALL_PROVIDERS, dmv)
+            df = loader(*args)
+            period = f'{df.columns[0]}-{df.columns[-1]}'
+
+            # Create animated choropleth map figure.
+            fig = figures.animated_choropleth(df=df,
+                                              title=f'{config["title"]} {region} {describe(sector, provider)} {period}',
+                                              label=config['unit'],
+                                              dmv=dmv,
+                                              color_continuous_scale=config['scale'],
+                                              geojson=geometry.url(dmv))
+        else:
+            # Get dataframe.
+            loader = config['loaders']['choro_dmv' if dmv else 'choro_us']
+            args = series_args(sector, provider) + (year,)
+            df = loader(*args)
+            period = year
+
+            # Create choropleth map figure.
+            fig = figures.choropleth(df=df,
+                                     title=f'{config["title"]} {region} {describe(sector, provider)} {year}',
+                                     label=config['unit'],
+                                     dmv=dmv,
+                                     color_continuous_scale=config['scale'],
+                                     geojson=geometry.url(dmv))
 
         # Print choropleth map figure to page.
-        st.write(fig)
+        st.plotly_chart(fig, config=figures.MAP_CONFIG)
 
         # Print DataFrame.
-        file_container = st.expander(label=f'Click to display Total Energy Consumption DMV {sector} {year} Data')
+        file_container = st.expander(label=f'Click to display {config["title"]} {region} {describe(sector, provider)} '
+                                           f'{period} Data')
         file_container.write(df)
 
-        # Save raw data button to save DataFrame as CSV file.
-        st.download_button(label='Press to Download Raw Data',
-                           data=df.to_csv(),
-                           file_name=f'{sector}.csv',
-                           mime='text/csv',
-                           key='download-csv2')
+        # Save raw data button, the file is only built when the button is pressed.
+        exports.download_button(loader=loader,
+                                args=args,
+                                file_name=f'{sector}',
+                                key=f'download-csv{number}')
+
 
+@fragment
+def line_section(config):
+    with profiling.section('Line plot'):
         # Subheader for line plot.
         st.subheader(body='Line Plot',
                      anchor='line-plot')
 
-        # Set 2 columns for the options.
-        col1, col2 = st.columns(2)
+        # Select boxes to choose sector and provider.
+        sector, provider, _ = select_series(config, 3)
 
-        with col1:
-            # Select box to choose sector.
-            sector = st.selectbox(label='Select a sector:',
-                                  options=('Total Consumption', 'Residential Sector', 'Commercial Sector',
-                                           'Industrial Sector', 'Transportation Sector'),
-                                  key='sector3')
-        with col2:
-            # Slider for year range.
-            years = st.slider(label='Select a year range:',
-                              min_value=1960,
-                              max_value=2019,
-                              value=(1960, 2019),
-                              key='range1')
-
-        # Get dataframe.
-        line_df = get_line_usage_df(sector, years)
+        # Get dataframe, every year of the series, the range slider on the plot narrows it in the browser.
+        first, last = year_range(config)
+        loader = config['loaders']['line']
+        args = series_args(sector, provider)
+        line_df = loader(*args)
 
         # Create line plot figure.
-        fig = px.line(data_frame=line_df,
-                      x='Year',
-                      y='value',
-                      color='State',
-                      title=f'Total Energy Consumption Estimates DMV {sector} {years[0]}-{years[1]}',
-                      labels={'value': 'Energy Consumption (Billion Btu)'})
+        fig = figures.line(df=line_df,
+                           title=f'{config["title"]} DMV {describe(sector, provider)} {first}-{last}',
+                           label=config['axis'])
 
         # Print line plot figure to page.
         st.write(fig)
 
         # Print DataFrame.
-        file_container = st.expander(label=f'Click to display Total Energy Consumption DMV {sector} '
-                                           f'{years[0]}-{years[1]} Data')
+        file_container = st.expander(label=f'Click to display {config["title"]} DMV {describe(sector, provider)} '
+                                           f'{first}-{last} Data')
         file_container.write(line_df)
 
-        # Save raw data button to save DataFrame as CSV file.
-        st.download_button(label='Press to Download Raw Data',
-                           data=line_df.to_csv(),
-                           file_name=f'{sector}.csv',
-                           mime='text/csv',
-                           key='download-csv3')
+        # Save raw data button, the file is only built when the button is pressed.
+        exports.download_button(loader=loader,
+                                args=args,
+                                file_name=f'{sector}',
+                                key='download-csv3')
 
+
+@fragment
+def machine_learning_section(config):
+    with profiling.section('Regression'):
         # Header for machine learning.
         st.header(body='Machine Learning',
                   anchor='machine-learning')
@@ -221,613 +292,453 @@ def main():
         st.write('Because we don\'t have data for recent years, we can use machine learning to predict values for any '
                  'year.')
 
-        # Subheader for linear regression model.
-        st.subheader(body='Scatter Plot with Linear Regression Model',
+        # Subheader for the forecasting model.
+        st.subheader(body='Scatter Plot with Forecasting Model',
                      anchor='scatter-plot')
 
-        # Set 2 columns for the options.
-        col1, col2 = st.columns(2)
+        # Select box to choose the model, the straight OLS line by default.
+        model = st.selectbox(label='Select a model:',
+                             options=tuple(models.MODELS),
+                             format_func=lambda model: models.MODELS[model]['label'],
+                             key='model')
+
+        # Set columns for the options.
+        columns = st.columns(2 if config['providers'] is None else 3)
 
-        with col1:
+        with columns[0]:
             # Select box to choose state.
             state = st.selectbox(label='Select a state:',
-                                 options=('US', 'DC', 'MD', 'VA'))
+                                 options=SCATTER_STATES)
 
-        with col2:
+        with columns[1]:
             # Select box to choose sector.
             sector = st.selectbox(label='Select a sector:',
-                                  options=('Total Consumption', 'Residential Sector', 'Commercial Sector',
-                                           'Industrial Sector', 'Transportation Sector'),
+                                  options=config['sectors'],
                                   key='sector4')
 
+        provider = None
+        if config['providers'] is not None:
+            with columns[2]:
+                # Select box to choose provider.
+                provider = st.selectbox(label='Select a provider:',
+                                        options=config['providers'],
+                                        key='provider4')
+
         # Get dataframe.
-        scatter_df = get_scatter_usage_df(sector, state)
+        loader = config['loaders']['scatter']
+        args = series_args(sector, provider) + (state,)
+        scatter_df = loader(*args)
+
+        # Look up the fitted model, every series is fitted ahead of time.
+        results = models.params(model, config['metric'], sector, provider or data.ALL_PROVIDERS, state)
+        label = models.MODELS[model]['label']
+
+        # Name of the series.
+        name = f'{config["title"]} {state} {describe(sector, provider)}'
+        first, last = year_range(config)
 
         # Create scatter plot figure.
-        fig = px.scatter(data_frame=scatter_df,
-                         x='Year',
-                         y='value',
-                         color='State',
-                         title=f'Total Energy Consumption Estimates {state} {sector} 1960-2019',
-                         labels={'value': 'Energy Consumption (Billion Btu)'},
-                         trendline='ols',
-                         trendline_color_override='red')
+        fig = figures.scatter(df=scatter_df,
+                              title=f'{name} {first}-{last}',
+                              label=config['axis'],
+                              fitted=models.fitted(model, scatter_df['Year'], scatter_df['value'], results),
+                              name=f'{label} fit')
 
         # Print scatter plot figure to page.
         st.write(fig)
 
-        # Get OLS results.
-        results = px.get_trendline_results(fig)
-
-        # Print summary.
+        # Print model parameters.
         file_container = st.expander(label='Click to display Model Parameters')
-        file_container.write(results.px_fit_results.iloc[0].summary())
+        file_container.write(results)
+
+        # Print the least squares diagnostics of the series, only built while the expander is open.
+        file_container, shown = lazy_expander(label='Click to display Linear Regression Diagnostics',
+                                              key='diagnostics')
+        if shown:
+            coefficients = regression.coefficients(config['metric'], sector, provider or data.ALL_PROVIDERS, state)
+            file_container.write(regression.diagnostics(coefficients))
+            file_container.write(f'n = `{coefficients["n"]:.0f}`, R² = `{coefficients["r2"]:.3f}`, '
+                                 f'Durbin-Watson = `{coefficients["durbin_watson"]:.3f}`')
+
+            # The full statsmodels table takes longer, build it only when asked for.
+            if file_container.checkbox(label='Show the full statsmodels summary', key='ols-summary'):
+                file_container.text(regression.ols_summary(x=scatter_df['Year'],
+                                                           y=scatter_df['value'],
+                                                           name=config['axis']).as_text())
+
+        # Print how long each model takes to fit every series.
+        file_container = st.expander(label='Click to display Model Fit Times')
+        file_container.write(models.fit_times())
 
         # Print DataFrame.
-        file_container = st.expander(label=f'Click to display Total Energy Consumption {state} {sector} '
-                                           f'1960-2019 Data')
+        file_container = st.expander(label=f'Click to display {name} {first}-{last} Data')
         file_container.write(scatter_df)
 
-        # Save raw data button to save DataFrame as CSV file.
-        st.download_button(label='Press to Download Raw Data',
-                           data=dmv_df.to_csv(),
-                           file_name=f'{sector}.csv',
-                           mime='text/csv',
-                           key='download-csv4')
-
-        # Get coefficients.
-        b = results.iloc[0]['px_fit_results'].params[0]
-        m = results.iloc[0]['px_fit_results'].params[1]
+        # Save raw data button, the file is only built when the button is pressed.
+        exports.download_button(loader=loader,
+                                args=args,
+                                file_name=f'{sector}',
+                                key='download-csv4')
 
         # Print subheader.
         st.subheader(body='Equation')
 
         # Print equation.
-        st.write('Total Energy Consumption Estimates ', state, ' ', sector, ' 1960-2019')
-        st.latex(f'y = {m}x + {b}')
+        st.write(f'{name} {first}-{last}')
+        st.latex(models.equation(model, results))
+
+    # The horizon slider only reruns the prediction, it is timed as a section of its own.
+    prediction_section(config, name, scatter_df, model, results)
 
+
+@fragment
+def prediction_section(config, name, scatter_df, model, results):
+    with profiling.section('Prediction'):
         # Print subheader for prediction.
         st.subheader(body='Prediction',
                      anchor='prediction')
 
-        year = st.number_input(label='Enter a year:',
-                               value=2022,
-                               format='%d')
-
-        # Print explanation.
-        st.write('Using Ordinary Least Squares (OLS) linear regression model, we predict that the Total Energy '
-                 'Consumption Estimates ', state, ' ', sector, ' will consume ', calculate_prediction(m, year, b),
-                 ' billion Btu of energy in ', year, '.')
-    elif visualization == 'Energy Usage Price':
-        # Set subheader.
-        st.subheader(body='Average Price by State by Provider, 1990-2020')
-
-        # Write description.
-        st.write('Revenue, sales, customer counts, and retail price by state and sector.')
-
-        # Subheader for choropleth map.
-        st.subheader(body='Choropleth Map')
-
-        # Subheader for U.S.
-        st.markdown(body='#### United States')
-
-        # Set 3 columns for the options.
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            # Select box to choose sector.
-            sector = st.selectbox(label='Select a sector:',
-                                  options=('Total', 'Residential', 'Commercial', 'Industrial', 'Transportation',
-                                           'Other'),
-                                  key='sector1')
-
-        with col2:
-            # Select box to choose provider.
-            provider = st.selectbox(label='Select a provider:',
-                                    options=('Total Electric Industry', 'Full-Service Providers',
-                                             'Restructured Retail Service Providers', 'Energy-Only Providers',
-                                             'Delivery-Only Providers'),
-                                    key='provider1')
-
-        with col3:
-            # Year slider.
-            year = st.slider(label='Select a year:',
-                             min_value=1990,
-                             max_value=2020,
-                             key='slider1')
-
-        # Get dataframe.
-        df = get_choro_us_price_df(sector, provider, year)
-
-        # Create figure.
-        fig = px.choropleth(data_frame=df,
-                            locations='State',
-                            locationmode='USA-states',
-                            color=sector,
-                            scope='usa',
-                            title=f'Average Price U.S. {sector} Sector {provider} {year}',
-                            labels={f'{sector}': 'cents/kWh'},
-                            color_continuous_scale='Blues')
-
-        # Print choropleth map figure to page.
-        st.write(fig)
-
-        # Print DataFrame.
-        file_container = st.expander(label=f'Click to display Average Price U.S. {sector} Sector {provider} {year} '
-                                           f'Data')
-        file_container.write(df)
-
-        # Save raw data button to save DataFrame as CSV file.
-        st.download_button(label='Press to Download Raw Data',
-                           data=df.to_csv(),
-                           file_name=f'{sector}.csv',
-                           mime='text/csv',
-                           key='download-csv1')
-
-        # Subheader for DMV.
-        st.markdown(body='#### DMV')
-
-        # Set 3 columns for the options.
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            # Select box to choose sector.
-            sector = st.selectbox(label='Select a sector:',
-                                  options=('Total', 'Residential', 'Commercial', 'Industrial', 'Transportation',
-                                           'Other'),
-                                  key='sector2')
-
-        with col2:
-            # Select box to choose provider.
-            provider = st.selectbox(label='Select a provider:',
-                                    options=('Total Electric Industry', 'Full-Service Providers',
-                                             'Restructured Retail Service Providers', 'Energy-Only Providers',
-                                             'Delivery-Only Providers'),
-                                    key='provider2')
-
-        with col3:
-            # Year slider.
-            year = st.slider(label='Select a year:',
-                             min_value=1990,
-                             max_value=2020,
-                             key='slider2')
-
-        # Get dataframe.
-        dmv_df = get_choro_dmv_price_df(sector, provider, year)
-
-        # Create choropleth map figure.
-        fig = px.choropleth(data_frame=dmv_df,
-                            locations='State',
-                            locationmode='USA-states',
-                            color=sector,
-                            scope='usa',
-                            title=f'Average Price DMV {sector} Sector {provider} {year}',
-                            labels={f'{sector}': 'cents/kWh'},
-                            color_continuous_scale='Blues')
-
-        fig.update_geos(fitbounds='locations')
-
-        # Print choropleth map figure to page.
-        st.write(fig)
-
-        # Print DataFrame.
-        file_container = st.expander(label=f'Click to display Average Price DMV {sector} Sector {provider} {year} '
-                                           f'Data')
-        file_container.write(dmv_df)
-
-        # Save raw data button to save DataFrame as CSV file.
-        st.download_button(label='Press to Download Raw Data',
-                           data=dmv_df.to_csv(),
-                           file_name=f'{sector}.csv',
-                           mime='text/csv',
-                           key='download-csv2')
-
-        # Subheader for line plot.
-        st.subheader('Line Plot',
-                     anchor='line-plot')
-
-        # Set 3 columns for the options.
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            # Select box to choose sector.
-            sector = st.selectbox(label='Select a sector:',
-                                  options=('Total', 'Residential', 'Commercial', 'Industrial', 'Transportation',
-                                           'Other'),
-                                  key='sector3')
-
-        with col2:
-            # Select box to choose provider.
-            provider = st.selectbox(label='Select a provider:',
-                                    options=('Total Electric Industry', 'Full-Service Providers',
-                                             'Restructured Retail Service Providers', 'Energy-Only Providers',
-                                             'Delivery-Only Providers'),
-                                    key='provider3')
-        with col3:
-            # Slider for year range.
-            years = st.slider(label='Select a year range:',
-                              min_value=1990,
-                              max_value=2020,
-                              value=(1990, 2020),
-                              key='range1')
-
-        # Get dataframe.
-        dmv_df = get_line_price_df(sector, provider, years)
-
-        # Create line plot figure.
-        fig = px.line(data_frame=dmv_df,
-                      x='Year',
-                      y=sector,
-                      color='State',
-                      title=f'Average Price DMV {sector} Sector {provider} {years[0]}-{years[1]}',
-                      labels={'Total': 'Average Price (Cents/kWh)'})
-
-        # Print line plot figure to page.
+        # First year without data.
+        start, last = year_range(config)
+        first = last + 1
+
+        # Slider for forecast horizon.
+        horizon = st.slider(label='Select a forecast horizon:',
+                            min_value=first,
+                            max_value=max(2050, first + 10),
+                            value=max(2030, first),
+                            key='horizon')
+
+        # Forecast every year after the data up to the horizon.
+        forecast_df = models.forecast(model=model,
+                                      results=results,
+                                      years=range(first, horizon + 1)).reset_index()
+
+        # Create forecast figure from the observed values.
+        fig = figures.forecast(df=scatter_df,
+                               forecast_df=forecast_df,
+                               title=f'Forecast {name} {start}-{horizon}',
+                               label=config['axis'],
+                               band=models.MODELS[model]['band'])
+
+        # Print forecast figure to page.
         st.write(fig)
 
         # Print DataFrame.
-        file_container = st.expander(label=f'Click to display Average Price DMV {sector} Sector {provider} {years[0]}-'
-                                           f'{years[1]} Data')
-        file_container.write(dmv_df)
-
-        # Save raw data button to save DataFrame as CSV file.
-        st.download_button(label='Press to Download Raw Data',
-                           data=dmv_df.to_csv(),
-                           file_name=f'{sector}.csv',
-                           mime='text/csv',
-                           key='download-csv3')
-
-        # Header for machine learning.
-        st.header(body='Machine Learning',
-                  anchor='machine-learning')
-
-        # Description for machine learning.
-        st.write('Because we don\'t have data for recent years, we can use machine learning to predict values for any '
-                 'year.')
-
-        # Subheader for linear regression model.
-        st.subheader(body='Scatter Plot with Linear Regression Model',
-                     anchor='scatter-plot')
-
-        # Set 3 columns for the options.
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            # Select box to choose state.
-            state = st.selectbox(label='Select a state:',
-                                 options=('US', 'DC', 'MD', 'VA'))
+        file_container = st.expander(label='Click to display Forecast Data')
+        file_container.write(forecast_df)
 
-        with col2:
-            # Select box to choose sector.
-            sector = st.selectbox(label='Select a sector:',
-                                  options=('Total', 'Residential', 'Commercial', 'Industrial', 'Transportation',
-                                           'Other'),
-                                  key='sector4')
+        # Forecast at the horizon.
+        last = forecast_df.iloc[-1]
 
-        with col3:
+        # Print explanation.
+        st.write(f'Using the {models.MODELS[model]["label"]} model, we predict that the {name} '
+                 f'{config["verb"]}', last['prediction'], f'{config["amount"]} in', horizon,
+                 f'({models.MODELS[model]["band"]}', last['lower'], 'to', last['upper'], ').')
+
+        # How far off the model was when refitted on the years up to each earlier year.
+        scores = get_backtest_df(*results.name)
+        if not scores.empty:
+            ahead = scores.iloc[0]
+            st.write(f'Refitted on the data up to each earlier year, its forecasts {ahead.name} year ahead were off by',
+                     ahead['mae'], f'{config["amount"]} on average ({ahead["mape"]:.1f}%), over',
+                     int(ahead['origins']), 'years.')
+
+        # Print backtest errors per horizon.
+        file_container = st.expander(label='Click to display Backtest Accuracy')
+        file_container.write(scores)
+
+
+@fragment
+def analysis_section():
+    with profiling.section('Data analysis'):
+        # Select box to choose sector.
+        sector = st.selectbox(label='Select a sector:',
+                              options=data.CONSUMPTION_SECTORS,
+                              index=1,
+                              key='sector5')
+
+        # Matching price sector.
+        price_sector = data.EXPENDITURE_SECTORS[sector]
+
+        for state, name in STATE_NAMES.items():
+            # Statistics of the state, looked up in the summary table.
+            usage = summary.stats(data.CONSUMPTION, sector, data.ALL_PROVIDERS, state)
+            price = summary.stats(data.PRICE, price_sector, data.PRICE_PROVIDERS[0], state)
+            spent = summary.stats(data.EXPENDITURE, price_sector, data.ALL_PROVIDERS, state)
+
+            # Who consumed the energy.
+            who = name if sector == data.CONSUMPTION_SECTORS[0] else f'{name}\'s {sector.lower()}'
+
+            # Print analysis of the state.
+            st.markdown(f"""
+            ###### {state}
+            - The minimum amount of energy that {who} consumed was {usage['min']:,.0f} billion Btu.
+            - The average amount of energy that {who} consumed was {usage['mean']:,.0f} billion Btu.
+            - The maximum amount of energy that {who} consumed was {usage['max']:,.0f} billion Btu, in {usage['peak_year']:.0f}.
+            - Energy consumption changed by {usage['cagr']:.2%} a year from {usage['first_year']:.0f} to {usage['last_year']:.0f}.
+            - The average {price_sector.lower()} price of electricity in {name} was {price['mean']:.2f} cents/kWh.
+            - At that price, the energy {who} consumed would have cost ${spent['mean']:,.0f} million a year on average, from {spent['first_year']:.0f} to {spent['last_year']:.0f}.
+            """)
+
+        # Print summary table.
+        file_container = st.expander(label='Click to display DMV Summary Statistics')
+        file_container.write(get_summary_df(sector, price_sector))
+
+
+def select_series(config, number):
+    # Set columns for the options, the last one is left for the caller.
+    columns = st.columns(2 if config['providers'] is None else 3)
+
+    with columns[0]:
+        # Select box to choose sector.
+        sector = st.selectbox(label='Select a sector:',
+                              options=config['sectors'],
+                              key=f'sector{number}')
+
+    provider = None
+    if config['providers'] is not None:
+        with columns[1]:
             # Select box to choose provider.
             provider = st.selectbox(label='Select a provider:',
-                                    options=('Total Electric Industry', 'Full-Service Providers',
-                                             'Restructured Retail Service Providers', 'Energy-Only Providers',
-                                             'Delivery-Only Providers'),
-                                    key='provider4')
-
-        # Get dataframe.
-        scatter_df = get_scatter_price_df(sector, provider, state)
-
-        # Create scatter plot figure.
-        fig = px.scatter(data_frame=scatter_df,
-                         x='Year',
-                         y=sector,
-                         color='State',
-                         title=f'Average Price {state} {sector} Sector {provider} 1990-2020',
-                         labels={'Total': 'Average Price (Cents/kWh)'},
-                         trendline='ols',
-                         trendline_color_override='red')
-
-        # Print scatter plot figure to page.
-        st.write(fig)
-
-        # Get OLS results.
-        results = px.get_trendline_results(fig)
-
-        # Print summary.
-        file_container = st.expander(label='Click to display Model Parameters')
-        file_container.write(results.px_fit_results.iloc[0].summary())
-
-        # Print DataFrame.
-        file_container = st.expander(label=f'Click to display Average Price {state} {sector} Sector {provider} 1990'
-                                           f'-2020 Data')
-        file_container.write(scatter_df)
-
-        # Save raw data button to save DataFrame as CSV file.
-        st.download_button(label='Press to Download Raw Data',
-                           data=dmv_df.to_csv(),
-                           file_name=f'{sector}.csv',
-                           mime='text/csv',
-                           key='download-csv4')
-
-        # Get coefficients.
-        b = results.iloc[0]['px_fit_results'].params[0]
-        m = results.iloc[0]['px_fit_results'].params[1]
-
-        # Print subheader.
-        st.subheader(body='Equation')
-
-        # Print equation.
-        st.write('Average Price ', state, ' ', sector, ' Sector ', provider, ' 1990-2020')
-        st.latex(f'y = {m}x + {b}')
-
-        # Print subheader for prediction.
-        st.subheader(body='Prediction',
-                     anchor='prediction')
-
-        year = st.number_input(label='Enter a year:',
-                               value=2022,
-                               format='%d')
-
-        # Print explanation.
-        st.write('Using Ordinary Least Squares (OLS) linear regression model, we predict that the Average Price ',
-                 state, ' ', sector, ' Sector ', provider, ' will cost ', calculate_prediction(m, year, b),
-                 ' Cents/kWh in ', year, '.')
-
-    # Print header for data analysis.
-    st.header(body='Data Analysis',
-              anchor='data-analysis')
-
-    # Print analysis.
-    st.write(""" 
-    ###### MD
-    - The minimum amount of energy that Maryland consumed was 142,516 billion BTU.
-    - The average amount of energy that Maryland consumed was 325,176 billion BTU.
-    - The maximum amount of energy that Maryland consumed was 454,757 billion BTU.
-    - The average price of energy use in Maryland cost $3,625,714.
-    
-    ###### DC
-    - The minimum amount of energy that DC consumed was 24,123 billion BTU.
-    - The minimum amount of energy that DC consumed was 34,855 billion BTU.
-    - The minimum amount of energy that DC consumed was 42,435 billion BTU.
-    - The average price of energy use in DC cost $414,776.
-
-    ###### VA
-    - The minimum amount of energy that Virginia consumed was 192,104 billion BTU.
-    - The minimum amount of energy that Virginia consumed was 449,575 billion BTU.
-    - The minimum amount of energy that Virginia consumed was 683,534 billion BTU.
-    - The average price of energy use in Virginia cost $7,341,562.
-    """)
-
-    # Print header.
-    st.markdown(body='###### Insights & Findings ')
-
-    # Print insights.
-    st.write(""" 
-    Based on the data analysis, we can make the inference that the DMV region has experienced 
-    an increase in energy consumption and energy usage price. This means that, with the current 
-    status of energy inefficiency across the states within the DMV region, there is a need for 
-    the implementation of energy efficiency policies and programs to help improve energy efficiency in the DMV.
-    """)
+                                    options=config['providers'],
+                                    key=f'provider{number}')
 
-    # Print header/subheader for Recommendations.
-    st.header(body='Recommendations',
-              anchor='recommendations')
+    return sector, provider, columns[-1]
 
-    # Print markdown
-    st.markdown(body='###### State-Level Energy Efficiency Programs')
 
-    # Print DMV.
-    st.write("""
-    -	MD
-    	- PEPCO - Commercial and Industrial Energy Efficiency Rebate Program
-    	- PEPCO - Residential Energy Efficiency Rebate Program
-    -	DC
-        - FirstEnergy (Potomac Edison) - Commercial and Industrial Energy Efficiency Rebate Program
-        - FirstEnergy (Potomac Edison) - Residential Energy Efficiency Rebate Program
-    -	VA
-        - Washington Gas - Commercial Energy Efficiency Rebate Program
-        - Washington Gas - Residential Energy Efficiency Rebate Program 
-    """)
+def year_range(config):
+    # First and last year in the data, so the sliders follow new releases.
+    years = cube.load_cube(config['metric']).years
 
-    # Print markdown
-    st.markdown(body='###### State-Level Energy Efficiency Policies')
+    return int(years[0]), int(years[-1])
 
-    # Print policies.
-    st.write("""
-    -	Encourage retro-commissioning when it comes to developing and building public and private buildings.
-    -	Implement state-wide energy performance building codes for the numerous commercial and residential buildings constructed or in the process of construction.
-    -	Provide educational classes and materials that help state citizens adjust their lifestyle to be more energy conscious and follow energy-efficient methods.
-    -	Implement energy efficiency standards and codes for household appliances, like washing machines and refrigerators, to encourage more energy-efficient appliances.
-    -	Monitor the state's ongoing energy consumption and cost analysis to curate energy efficiency programs and policies for the state's current energy status.
-    """)
 
-    # Return to top link.
-    st.markdown(body='<a href="#title">Link to top</a>',
-                unsafe_allow_html=True)
+def series_args(sector, provider):
+    # Loader arguments, consumption has no provider.
+    return (sector,) if provider is None else (sector, provider)
 
-    # # Remove top right menu.
-    st.markdown(body="""
-                     <style>
-                     header {visibility: hidden;}
-                     #MainMenu {visibility: hidden;}
-                     footer {visibility: hidden;}
-                     </style>
-                     """,
-                unsafe_allow_html=True)
-
-
-@st.cache
-def get_choro_us_usage_df(sector):
-    # Read total energy consumption data.
-    df = pd.read_excel(io=r'use_tot_sector.xlsx',
-                       sheet_name=sector,
-                       header=2)
-
-    # Drop first row.
-    df.drop(index=df.index[0],
-            axis=0,
-            inplace=True)
 
-    # Drop last row.
-    df.drop(index=df.index[-1],
-            axis=0,
-            inplace=True)
+def lazy_expander(label, key):
+    # Expander that reports whether it is open, where older Streamlit cannot tell a checkbox inside asks instead.
+    try:
+        container = st.expander(label=label, key=key, on_change='rerun')
+    except TypeError:
+        container = st.expander(label=label)
+        return container, container.checkbox(label='Show', key=key)
 
-    return df
+    return container, bool(container.open)
 
 
-@st.cache
-def get_choro_dmv_usage_df(sector):
-    # Read total energy consumption data.
-    df = pd.read_excel(io=r'use_tot_sector.xlsx',
-                       sheet_name=sector,
-                       header=2)
+def describe(sector, provider):
+    # Label of a series in titles.
+    return sector if provider is None else f'{sector} Sector {provider}'
 
-    # Drop first row.
-    df.drop(index=df.index[0],
-            axis=0,
-            inplace=True)
 
-    # Drop last row.
-    df.drop(index=df.index[-1],
-            axis=0,
-            inplace=True)
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
+def get_choro_us_usage_df(sector, year):
+    # Every state for the year.
+    return cube.load_cube(data.CONSUMPTION).choropleth_df(sector=sector,
+                                                          provider=data.ALL_PROVIDERS,
+                                                          year=year)
 
-    # Drops states except DMV.
-    df = df[df['State'].isin(['DC', 'MD', 'VA'])]
 
-    return df
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
+def get_choro_dmv_usage_df(sector, year):
+    # DMV states for the year.
+    return cube.load_cube(data.CONSUMPTION).choropleth_df(sector=sector,
+                                                          provider=data.ALL_PROVIDERS,
+                                                          year=year,
+                                                          states=data.DMV)
 
 
-@st.cache
-def get_line_usage_df(sector, years):
-    # Read total energy consumption data.
-    df = pd.read_excel(io=r'use_tot_sector.xlsx',
-                       sheet_name=sector,
-                       header=2)
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
+def get_line_usage_df(sector):
+    # DMV states for every year.
+    return cube.load_cube(data.CONSUMPTION).line_df(sector=sector,
+                                                    provider=data.ALL_PROVIDERS,
+                                                    states=data.DMV)
 
-    # Drop first row.
-    df.drop(index=df.index[0],
-            axis=0,
-            inplace=True)
 
-    # Drop last row.
-    df.drop(index=df.index[-1],
-            axis=0,
-            inplace=True)
-
-    # Drops states except DMV.
-    df = df[df['State'].isin(['DC', 'MD', 'VA'])]
-
-    # Make years a column for plotting.
-    df = pd.melt(frame=df,
-                 id_vars=['State'],
-                 var_name='Year')
-
-    # Filter between year range.
-    df = df[df['Year'] >= years[0]]
-    df = df[df['Year'] <= years[1]]
-
-    return df
-
-
-@st.cache
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
 def get_scatter_usage_df(sector, state):
-    # Read total energy consumption data.
-    df = pd.read_excel(io=r'use_tot_sector.xlsx',
-                       sheet_name=sector,
-                       header=2)
-
-    # Drop first row.
-    df.drop(index=df.index[0],
-            axis=0,
-            inplace=True)
-
-    # Drop other states.
-    df = df[df['State'].isin(['DC', 'MD', 'VA', 'US'])]
-    df = df[df['State'] == state]
+    # The state for every year.
+    return cube.load_cube(data.CONSUMPTION).line_df(sector=sector,
+                                                    provider=data.ALL_PROVIDERS,
+                                                    states=[state])
 
-    # Make years a column for plotting.
-    df = pd.melt(frame=df,
-                 id_vars=['State'],
-                 var_name='Year')
 
-    return df
-
-
-@st.cache
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
 def get_choro_us_price_df(sector, provider, year):
-    # Read average price data.
-    df = pd.read_excel(io=r'avgprice_annual.xlsx',
-                       sheet_name='Price',
-                       header=1)
-
-    # Filter sector, provider, and year.
-    df = df[df['Year'] == year]
-    df = df[df['Industry Sector Category'] == provider]
-    df = df[['Year', 'State', 'Industry Sector Category', f'{sector}']]
-
-    return df
+    # Every state for the year.
+    return cube.load_cube(data.PRICE).choropleth_df(sector=sector,
+                                                    provider=provider,
+                                                    year=year)
 
 
-@st.cache
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
 def get_choro_dmv_price_df(sector, provider, year):
-    # Read average price data.
-    df = pd.read_excel(io=r'avgprice_annual.xlsx',
-                       sheet_name='Price',
-                       header=1)
-
-    # Filter sector, provider, and year.
-    df = df[df['Year'] == year]
-    df = df[df['Industry Sector Category'] == provider]
-    df = df[['Year', 'State', 'Industry Sector Category', f'{sector}']]
-
-    # Drops states except DMV.
-    df = df[df['State'].isin(['DC', 'MD', 'VA'])]
-
-    return df
-
+    # DMV states for the year.
+    return cube.load_cube(data.PRICE).choropleth_df(sector=sector,
+                                                    provider=provider,
+                                                    year=year,
+                                                    states=data.DMV)
 
-@st.cache
-def get_line_price_df(sector, provider, years):
-    # Read average price data.
-    df = pd.read_excel(io=r'avgprice_annual.xlsx',
-                       sheet_name='Price',
-                       header=1)
 
-    # Filter sector and provider.
-    df = df[df['Industry Sector Category'] == provider]
-    df = df[['Year', 'State', 'Industry Sector Category', f'{sector}']]
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
+def get_line_price_df(sector, provider):
+    # DMV states for every year.
+    return cube.load_cube(data.PRICE).line_df(sector=sector,
+                                              provider=provider,
+                                              states=data.DMV)
 
-    # Drops states except DMV.
-    df = df[df['State'].isin(['DC', 'MD', 'VA'])]
 
-    # Filter between year range.
-    df = df[df['Year'] >= years[0]]
-    df = df[df['Year'] <= years[1]]
-
-    return df
-
-
-@st.cache
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
 def get_scatter_price_df(sector, provider, state):
-    # Read average price data.
-    df = pd.read_excel(io=r'avgprice_annual.xlsx',
-                       sheet_name='Price',
-                       header=1)
-
-    # Filter sector and provider.
-    df = df[df['Industry Sector Category'] == provider]
-    df = df[['Year', 'State', 'Industry Sector Category', f'{sector}']]
-
-    # Drops states except DMV.
-    df = df[df['State'].isin(['DC', 'MD', 'VA', 'US'])]
-    df = df[df['State'] == state]
-
-    return df
-
-
-@st.cache
-def calculate_prediction(m, year, b):
-    return m * year + b
+    # The state for every year.
+    return cube.load_cube(data.PRICE).line_df(sector=sector,
+                                              provider=provider,
+                                              states=[state])
+
+
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
+def get_choro_us_expenditure_df(sector, year):
+    # Every state for the year.
+    return cube.load_cube(data.EXPENDITURE).choropleth_df(sector=sector,
+                                                          provider=data.ALL_PROVIDERS,
+                                                          year=year)
+
+
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
+def get_choro_dmv_expenditure_df(sector, year):
+    # DMV states for the year.
+    return cube.load_cube(data.EXPENDITURE).choropleth_df(sector=sector,
+                                                          provider=data.ALL_PROVIDERS,
+                                                          year=year,
+                                                          states=data.DMV)
+
+
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
+def get_line_expenditure_df(sector):
+    # DMV states for every year.
+    return cube.load_cube(data.EXPENDITURE).line_df(sector=sector,
+                                                    provider=data.ALL_PROVIDERS,
+                                                    states=data.DMV)
+
+
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
+def get_scatter_expenditure_df(sector, state):
+    # The state for every year.
+    return cube.load_cube(data.EXPENDITURE).line_df(sector=sector,
+                                                    provider=data.ALL_PROVIDERS,
+                                                    states=[state])
+
+
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
+def get_backtest_df(model, metric, sector, provider, state):
+    # Errors of the model's past forecasts of the series, per horizon.
+    return backtest.scores(model, metric, sector, provider, state)
+
+
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
+def get_summary_df(sector, price_sector):
+    # DMV rows of every dataset for the sector.
+    table = summary.load_summary()
+
+    return pd.concat([table.loc[(data.CONSUMPTION, sector, data.ALL_PROVIDERS, list(data.DMV)), :],
+                      table.loc[(data.PRICE, price_sector, list(data.PRICE_PROVIDERS), list(data.DMV)), :],
+                      table.loc[(data.EXPENDITURE, price_sector, data.ALL_PROVIDERS, list(data.DMV)), :]])
+
+
+@profiling.timed
+@caching.bounded_cache(version=data.fingerprint)
+def get_choro_panel_df(metric, sector, provider, dmv):
+    # Every year of every state, or of DMV states.
+    return cube.load_cube(metric).panel_df(sector=sector,
+                                           provider=provider,
+                                           states=data.DMV if dmv else None)
+
+
+# States of the regression, the U.S. total and the DMV.
+SCATTER_STATES = (data.US,) + data.DMV
+
+# Names of the DMV states in the analysis.
+STATE_NAMES = {'MD': 'Maryland',
+               'DC': 'DC',
+               'VA': 'Virginia'}
+
+
+# Widgets, labels and loaders of each dataset.
+DATASETS = {
+    'Energy Consumption': {
+        'metric': data.CONSUMPTION,
+        'heading': 'Total Energy Consumption Estimates by End-Use Sector',
+        'description': 'Comprehensive state-level estimates of energy production, consumption, prices, and '
+                       'expenditures by source and sector.',
+        'title': 'Total Energy Consumption Estimates',
+        'sectors': data.CONSUMPTION_SECTORS,
+        'providers': None,
+        'unit': 'Billion Btu',
+        'axis': 'Energy Consumption (Billion Btu)',
+        'scale': None,
+        'verb': 'will consume',
+        'amount': 'billion Btu of energy',
+        'loaders': {'choro_us': get_choro_us_usage_df,
+                    'choro_dmv': get_choro_dmv_usage_df,
+                    'line': get_line_usage_df,
+                    'scatter': get_scatter_usage_df},
+    },
+    'Energy Usage Price': {
+        'metric': data.PRICE,
+        'heading': 'Average Price by State by Provider',
+        'description': 'Revenue, sales, customer counts, and retail price by state and sector.',
+        'title': 'Average Price',
+        'sectors': data.PRICE_SECTORS,
+        'providers': data.PRICE_PROVIDERS,
+        'unit': 'cents/kWh',
+        'axis': 'Average Price (Cents/kWh)',
+        'scale': 'Blues',
+        'verb': 'will cost',
+        'amount': 'Cents/kWh',
+        'loaders': {'choro_us': get_choro_us_price_df,
+                    'choro_dmv': get_choro_dmv_price_df,
+                    'line': get_line_price_df,
+                    'scatter': get_scatter_price_df},
+    },
+    'Energy Expenditure': {
+        'metric': data.EXPENDITURE,
+        'heading': 'Estimated Energy Expenditure by End-Use Sector',
+        'description': 'Energy consumption priced at the average retail price of electricity of the whole industry, '
+                       f'at {data.BTU_PER_KWH:,} Btu per kWh. It is what the energy would cost as electricity, not '
+                       'what was spent on every fuel.',
+        'title': 'Estimated Energy Expenditure',
+        'sectors': tuple(data.EXPENDITURE_SECTORS.values()),
+        'providers': None,
+        'unit': 'Million $',
+        'axis': 'Energy Expenditure (Million $)',
+        'scale': 'Greens',
+        'verb': 'will cost',
+        'amount': 'million dollars',
+        'loaders': {'choro_us': get_choro_us_expenditure_df,
+                    'choro_dmv': get_choro_dmv_expenditure_df,
+                    'line': get_line_expenditure_df,
+                    'scatter': get_scatter_expenditure_df},
+    },
+}
 
 
 if __name__ == '__main__':
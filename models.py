@@ -0,0 +1,420 @@
+import argparse
+import functools
+import time
+
+import numpy as np
+import pandas as pd
+
+import cube
+import data
+import ingest
+import regression
+
+# Index of the fit table.
+INDEX = ['Model', 'Metric', 'Sector', 'Provider', 'State']
+
+# Fits saved in the cache, updated by an incremental refresh or else fitted by one worker for all of them.
+TABLE = ingest.Table('models', INDEX, lambda: _fit_every_series())
+
+# Wall time of each (model, dataset) task of the last full fit, saved next to the fits.
+TIMES = ingest.Table('model-times', ['Model', 'Metric'], lambda: fit_all()[1])
+
+# Year the polynomial, log-linear and piecewise models count from, keeps the squares small.
+ORIGIN = 2000
+
+# Smoothing weights tried for exponential smoothing.
+GRID = np.linspace(0.1, 0.9, 9)
+
+
+def load_fits():
+    # Refit only when one of the workbooks changes.
+    return TABLE.load(data.fingerprint())
+
+
+def params(model, metric, sector, provider, state):
+    table = load_fits()
+    key = (model, metric, sector, provider, state)
+
+    # Series without data have no fit.
+    if key not in table.index:
+        return pd.Series(data=np.nan,
+                         index=table.columns,
+                         name=key)
+
+    # Fitted parameters of one series, without the columns of the other models.
+    positions, columns = _columns(*data.fingerprint())[model]
+
+    return pd.Series(data=table.loc[key].to_numpy()[positions],
+                     index=columns,
+                     name=key)
+
+
+@functools.lru_cache(maxsize=1)
+def _columns(consumption_hash, price_hash):
+    # Positions and names of the columns each model fills, found once per fit table rather than on every lookup.
+    filled = TABLE.load((consumption_hash, price_hash)).notna().groupby(level='Model', sort=False).any()
+
+    return {model: (np.flatnonzero(row), filled.columns[row]) for model, row in zip(filled.index, filled.to_numpy())}
+
+
+def fit_times(times=None):
+    # Seconds each model took to fit every series of both datasets, and per series.
+    times = TIMES.load(data.fingerprint()) if times is None else times
+    df = times.groupby(level='Model', sort=False)[['series', 'seconds']].sum()
+    df['ms per series'] = df['seconds'] / df['series'] * 1e3
+
+    return df.reindex([model for model in MODELS if model in df.index])
+
+
+def fitted(model, years, values, results):
+    # Values the model gives for the observed years of one series.
+    years = np.asarray(years, dtype='float64')
+
+    if model == 'exponential smoothing':
+        # One step ahead predictions, rerun with the fitted weights.
+        y = np.asarray(values, dtype='float64')[None, :]
+        return _smooth(years, y, np.array([results['alpha']]), np.array([results['beta']]))[3][0, 0]
+
+    return MODELS[model]['predict'](_frame(results), years)[0]
+
+
+def forecast(model, results, years, level=0.95):
+    # Exact OLS prediction intervals for the straight line.
+    if model == 'linear':
+        return regression.forecast(coefficients=results.rename(results.name[1:]), years=years, level=level)
+
+    years = np.atleast_1d(np.asarray(years, dtype='float64'))
+    df = _frame(results)
+    prediction = MODELS[model]['predict'](df, years)[0]
+
+    # Residual band, it leaves out the uncertainty of the parameters.
+    spread = results['sigma'] * np.ones_like(years)
+    if model == 'exponential smoothing':
+        # Errors add up with every step past the last observation.
+        spread = spread * np.sqrt(np.maximum(years - results['anchor'], 1))
+
+    t = regression.t_quantile(level, results['n'] - MODELS[model]['parameters'])
+
+    index = pd.MultiIndex.from_tuples([results.name[1:] + (int(year),) for year in years],
+                                      names=regression.INDEX + ['Year'])
+
+    return pd.DataFrame({'prediction': prediction,
+                         'lower': prediction - t * spread,
+                         'upper': prediction + t * spread},
+                        index=index)
+
+
+def equation(model, results):
+    # LaTeX of the fitted curve, x is the year.
+    if model == 'linear':
+        return f'y = {results["slope"]:.6g}x{_term(results["intercept"])}'
+
+    t = f'(x - {ORIGIN})'
+
+    if model == 'polynomial':
+        return f'y = {results["intercept"]:.6g}{_term(results["slope"], t)}{_term(results["curvature"], f"{t}^2")}'
+
+    if model == 'log-linear':
+        return f'y = e^{{{results["intercept"]:.6g}{_term(results["slope"], t)}}}'
+
+    if model == 'piecewise':
+        hinge = f'\\max(0, x - {results["knot"]:.0f})'
+        return f'y = {results["intercept"]:.6g}{_term(results["slope"], t)}{_term(results["slope_change"], hinge)}'
+
+    steps = f'(x - {results["anchor"]:.0f})'
+    return (f'y = {results["level"]:.6g}{_term(results["trend"], steps)}, '
+            f'\\alpha = {results["alpha"]:.2f}, \\beta = {results["beta"]:.2f}')
+
+
+def _term(coefficient, factor=''):
+    # Next term of a sum, a negative coefficient is written as a subtraction.
+    sign = '-' if coefficient < 0 else '+'
+
+    return f' {sign} {abs(coefficient):.6g}{factor}'
+
+
+def fit_all(series=None, max_workers=None):
+    # One task per model and dataset, each fits every series of the dataset at once. Returns the fits and the
+    # wall time of every task.
+    tasks = []
+    for metric in data.METRICS:
+        years, rows, labels = cube.rows(metric, series)
+        if len(labels):
+            tasks += [(model, metric, years, rows, labels) for model in MODELS]
+
+    if not tasks:
+        return pd.DataFrame(columns=INDEX).set_index(INDEX), pd.DataFrame(columns=TIMES.index).set_index(TIMES.index)
+
+    # Fit in parallel.
+    args = [(model, years, rows) for model, metric, years, rows, labels in tasks]
+    results = ingest.map_spawned(_timed_fit, args, max_workers)
+
+    frames = []
+    times = []
+    for (model, metric, years, rows, labels), (df, seconds) in zip(tasks, results):
+        df.index = pd.MultiIndex.from_tuples([(model,) + label for label in labels], names=INDEX)
+
+        # Drop combinations without data.
+        df = df[df['n'] > 0]
+        frames.append(df)
+        times.append((model, metric, len(df), seconds))
+
+    times = pd.DataFrame(times, columns=TIMES.index + ['series', 'seconds']).set_index(TIMES.index)
+
+    return pd.concat(frames).sort_index(), times
+
+
+def update_fits(fits, series):
+    # Refit every model on the given (metric, sector, provider, state) series, keep the other rows.
+    kept = fits[~fits.index.droplevel('Model').isin(series)]
+
+    return pd.concat([kept, fit_all(series)[0]]).sort_index()
+
+
+def fit_linear(years, y):
+    # Same straight line as the regression module.
+    return regression.fit(years, y)
+
+
+def predict_linear(df, years):
+    return df['intercept'].to_numpy()[:, None] + df['slope'].to_numpy()[:, None] * years
+
+
+def fit_polynomial(years, y):
+    t = years - ORIGIN
+    x = np.column_stack([np.ones_like(t), t, t * t])
+    coefficients = _least_squares(x, y)
+    df = pd.DataFrame(coefficients, columns=['intercept', 'slope', 'curvature'])
+
+    return _errors(df, y, coefficients @ x.T, 3)
+
+
+def predict_polynomial(df, years):
+    t = years - ORIGIN
+
+    return (df['intercept'].to_numpy()[:, None] + df['slope'].to_numpy()[:, None] * t +
+            df['curvature'].to_numpy()[:, None] * t * t)
+
+
+def fit_log_linear(years, y):
+    # Straight line through the logarithms, only positive values have one.
+    t = years - ORIGIN
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logs = np.where(y > 0, np.log(y), np.nan)
+    df = pd.DataFrame(_least_squares(np.column_stack([np.ones_like(t), t]), logs), columns=['intercept', 'slope'])
+
+    # Errors and fit on the original scale.
+    return _errors(df, y, predict_log_linear(df, years), 2)
+
+
+def predict_log_linear(df, years):
+    with np.errstate(over='ignore'):
+        return np.exp(df['intercept'].to_numpy()[:, None] + df['slope'].to_numpy()[:, None] * (years - ORIGIN))
+
+
+def fit_piecewise(years, y):
+    # Two joined lines, the knot is the year with the smallest squared error.
+    t = years - ORIGIN
+    mask = ~np.isnan(y)
+
+    best_sse = np.full(len(y), np.inf)
+    best = np.full((len(y), 4), np.nan)
+    for knot in years[1:-1]:
+        x = np.column_stack([np.ones_like(t), t, np.maximum(t - (knot - ORIGIN), 0)])
+        coefficients = _least_squares(x, y)
+
+        # Each line needs at least three observed years.
+        before = (mask & (years <= knot)).sum(axis=1)
+        after = (mask & (years >= knot)).sum(axis=1)
+        sse = np.where((before >= 3) & (after >= 3), _sse(y, coefficients @ x.T), np.inf)
+
+        better = sse < best_sse
+        best_sse = np.where(better, sse, best_sse)
+        best[better] = np.column_stack([coefficients, np.full(len(y), knot)])[better]
+
+    df = pd.DataFrame(best, columns=['intercept', 'slope', 'slope_change', 'knot'])
+
+    return _errors(df, y, predict_piecewise(df, years), 4)
+
+
+def predict_piecewise(df, years):
+    t = years - ORIGIN
+    hinge = np.maximum(years - df['knot'].to_numpy()[:, None], 0)
+
+    return (df['intercept'].to_numpy()[:, None] + df['slope'].to_numpy()[:, None] * t +
+            df['slope_change'].to_numpy()[:, None] * hinge)
+
+
+def fit_exponential_smoothing(years, y):
+    # Holt's linear trend, the weights with the smallest one step ahead error on a grid.
+    alpha, beta = (grid.ravel() for grid in np.meshgrid(GRID, GRID, indexing='ij'))
+    level, trend, last, prediction = _smooth(years, y, alpha, beta)
+
+    with np.errstate(invalid='ignore'):
+        errors = prediction - y[None, :, :]
+    sse = np.where(np.isnan(errors), 0, errors * errors).sum(axis=2)
+    best = sse.argmin(axis=0)
+    rows = np.arange(y.shape[0])
+
+    df = pd.DataFrame({'level': level[best, rows],
+                       'trend': trend[best, rows],
+                       'alpha': alpha[best],
+                       'beta': beta[best],
+                       'anchor': last[best, rows]})
+
+    return _errors(df, y, prediction[best, rows], 2)
+
+
+def predict_exponential_smoothing(df, years):
+    # Straight line from the level at the last observed year.
+    steps = years - df['anchor'].to_numpy()[:, None]
+
+    return np.where(steps > 0, df['level'].to_numpy()[:, None] + df['trend'].to_numpy()[:, None] * steps, np.nan)
+
+
+# Forecasting models: label, fit of every row of a year-by-value array, prediction for any year, the number
+# of fitted parameters and the name of the forecast band, only the straight line has an exact interval.
+MODELS = {'linear': {'label': 'Linear (OLS)',
+                     'fit': fit_linear,
+                     'predict': predict_linear,
+                     'parameters': 2,
+                     'band': '95% prediction interval'},
+          'polynomial': {'label': 'Quadratic polynomial',
+                         'fit': fit_polynomial,
+                         'predict': predict_polynomial,
+                         'parameters': 3,
+                         'band': 'approximate 95% band'},
+          'log-linear': {'label': 'Log-linear (constant growth rate)',
+                         'fit': fit_log_linear,
+                         'predict': predict_log_linear,
+                         'parameters': 2,
+                         'band': 'approximate 95% band'},
+          'exponential smoothing': {'label': 'Exponential smoothing (Holt)',
+                                    'fit': fit_exponential_smoothing,
+                                    'predict': predict_exponential_smoothing,
+                                    'parameters': 2,
+                                    'band': 'approximate 95% band'},
+          'piecewise': {'label': 'Piecewise linear (one knot)',
+                        'fit': fit_piecewise,
+                        'predict': predict_piecewise,
+                        'parameters': 4,
+                        'band': 'approximate 95% band'}}
+
+
+def _timed_fit(model, years, rows):
+    start = time.perf_counter()
+    df = MODELS[model]['fit'](years, rows)
+
+    return df.drop(columns=['sse'], errors='ignore'), time.perf_counter() - start
+
+
+def _least_squares(x, y):
+    # Least squares of every row of y on the columns of x, ignoring NaN.
+    mask = ~np.isnan(y)
+    observed = np.where(mask, y, 0)
+
+    # Normal equations of each row over its observed years, pinv copes with too few of them.
+    a = np.einsum('ry,yi,yj->rij', mask.astype('float64'), x, x)
+    b = np.einsum('ry,yi->ri', observed, x)
+
+    return np.einsum('rij,rj->ri', np.linalg.pinv(a), b)
+
+
+def _sse(y, prediction):
+    # Squared error over the observed years, years without a prediction, e.g. before smoothing has a trend, do not
+    # count.
+    with np.errstate(invalid='ignore'):
+        residuals = np.where(~np.isnan(y) & ~np.isnan(prediction), y - prediction, 0)
+
+    return (residuals * residuals).sum(axis=1)
+
+
+def _errors(df, y, prediction, parameters):
+    # Number of points, residual error and goodness of fit of every row.
+    mask = ~np.isnan(y)
+    n = mask.sum(axis=1)
+
+    sse = _sse(y, prediction)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(mask, y, 0).sum(axis=1) / n
+        syy = (np.where(mask, y - mean[:, None], 0) ** 2).sum(axis=1)
+
+        # Added at once, inserting columns one by one is slow.
+        return df.assign(n=n,
+                         sse=sse,
+                         sigma=np.where(n > parameters, np.sqrt(sse / (n - parameters)), np.nan),
+                         r2=np.where(n > parameters, 1 - sse / syy, np.nan))
+
+
+def _smooth(years, y, alpha, beta):
+    # Holt's recursions for every pair of weights at once, arrays are weights by rows.
+    alpha = alpha[:, None]
+    beta = beta[:, None]
+    shape = (len(alpha), y.shape[0])
+    level = np.full(shape, np.nan)
+    trend = np.full(shape, np.nan)
+    last = np.full(shape, np.nan)
+    prediction = np.full(shape + (len(years),), np.nan)
+
+    for j, year in enumerate(years):
+        observed = y[None, :, j]
+        seen = ~np.isnan(observed)
+        started = ~np.isnan(level)
+        trending = ~np.isnan(trend)
+
+        # Prediction for this year from the last observed one, gaps are spanned by the trend.
+        steps = year - last
+        prediction[:, :, j] = level + steps * trend
+
+        # Update with the observation, the first two only start the level and the trend.
+        smoothed = alpha * observed + (1 - alpha) * (level + steps * trend)
+        with np.errstate(invalid='ignore'):
+            trend = np.where(seen & trending, beta * (smoothed - level) / steps + (1 - beta) * trend,
+                             np.where(seen & started, (observed - level) / steps, trend))
+        level = np.where(seen & trending, smoothed, np.where(seen, observed, level))
+        last = np.where(seen, year, last)
+
+    return level, trend, last, prediction
+
+
+def _frame(results):
+    # One row of the fit table as a frame for the predict functions.
+    return pd.DataFrame([results.to_numpy()], columns=results.index)
+
+
+def _fit_every_series():
+    # Fits of every series, the time each task took is saved for the same workbooks.
+    fits, times = fit_all()
+    TIMES.save(times, data.fingerprint())
+
+    return fits
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit every forecasting model to every series and report the time '
+                                                 'each model takes.')
+    parser.add_argument('--workers', type=int, help='worker processes, one per model and dataset up to the CPU '
+                                                    'count by default')
+    args = parser.parse_args()
+
+    # Data loading is not part of the fit times.
+    data.warm_up()
+    for metric in data.METRICS:
+        cube.load_cube(metric)
+
+    start = time.perf_counter()
+    fits, times = fit_all(max_workers=args.workers)
+    wall = time.perf_counter() - start
+
+    TABLE.save(fits, data.fingerprint())
+    TIMES.save(times, data.fingerprint())
+
+    print(f'{"model":<22} {"series":>7} {"fit s":>8} {"ms/series":>10}')
+    for model, row in fit_times(times).iterrows():
+        print(f'{model:<22} {row["series"]:>7.0f} {row["seconds"]:>8.3f} {row["ms per series"]:>10.3f}')
+    print(f'Fit every model in {wall:.2f} s of wall time.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+import contextlib
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import caching
+
+# Environment variable turning profiling on for every run.
+ENV = 'DMV_PROFILE'
+
+# Environment variable naming a JSON lines file to append each run to.
+LOG_ENV = 'DMV_PROFILE_LOG'
+
+# Query parameter turning profiling on for one session, e.g. ?profile=1.
+QUERY_PARAM = 'profile'
+
+# Every script run happens on its own thread.
+_local = threading.local()
+
+
+class Profiler:
+    # Timings collected during one script run.
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.records = []
+        self.start = time.perf_counter()
+
+    def record(self, name, kind, seconds):
+        self.records.append({'name': name,
+                             'kind': kind,
+                             'ms': seconds * 1e3})
+
+    def summary(self):
+        # Total time and calls per section and loader.
+        df = pd.DataFrame(self.records, columns=['name', 'kind', 'ms'])
+        df = df.groupby(['kind', 'name'], sort=False).agg(ms=('ms', 'sum'),
+                                                           calls=('ms', 'size'))
+
+        return df.reset_index()
+
+    def render(self, container):
+        total = (time.perf_counter() - self.start) * 1e3
+
+        # Print profiling header.
+        container.title(body='Profiling')
+        container.write(f'Rerun took {total:.1f} ms.')
+
+        # Print breakdown.
+        container.dataframe(self.summary().round({'ms': 2}),
+                            hide_index=True)
+
+        # Print cache counters.
+        container.write('Loader caches')
+        container.dataframe(pd.DataFrame(caching.stats()),
+                            hide_index=True)
+
+    def write_log(self, path):
+        total = (time.perf_counter() - self.start) * 1e3
+
+        # One JSON object per run.
+        entry = {'time': datetime.datetime.now().isoformat(timespec='milliseconds'),
+                 'total_ms': total,
+                 'records': self.records}
+
+        with open(path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+def requested():
+    # Turned on for every run by the environment.
+    if os.environ.get(ENV, '') not in ('', '0'):
+        return True
+
+    # Turned on for this session by the query string.
+    if hasattr(st, 'query_params'):
+        value = st.query_params.get(QUERY_PARAM)
+    else:
+        value = st.experimental_get_query_params().get(QUERY_PARAM, [None])[0]
+
+    return value not in (None, '', '0')
+
+
+def start():
+    # Profiler of this script run.
+    _local.profiler = Profiler(enabled=requested())
+
+    return _local.profiler
+
+
+def finish(container):
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is None or not profiler.enabled:
+        return
+
+    # Show the breakdown.
+    profiler.render(container)
+
+    # Write the breakdown to the structured log.
+    path = os.environ.get(LOG_ENV)
+    if path:
+        profiler.write_log(path)
+
+
+def record(name, kind, seconds):
+    # Add a timing measured elsewhere, e.g. in a worker process.
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is not None and profiler.enabled:
+        profiler.record(name, kind, seconds)
+
+
+def _fragment_rerun():
+    # Only fragments run when the run context lists their ids.
+    ctx = get_script_run_ctx()
+
+    return bool(ctx and ctx.fragment_ids_this_run)
+
+
+@contextlib.contextmanager
+def section(name):
+    depth = getattr(_local, 'depth', 0)
+
+    # A fragment rerun only runs its own section, time it as a run of its own.
+    partial = depth == 0 and _fragment_rerun()
+    if partial:
+        _local.profiler = Profiler(enabled=requested())
+
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is None or not profiler.enabled:
+        yield
+        return
+
+    _local.depth = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _local.depth = depth
+        profiler.record(name, 'section', time.perf_counter() - start)
+
+    # The sidebar is out of reach of a fragment, report next to the section instead.
+    if partial:
+        st.caption(f'{name} rerun took {(time.perf_counter() - profiler.start) * 1e3:.1f} ms.')
+
+        path = os.environ.get(LOG_ENV)
+        if path:
+            profiler.write_log(path)
+
+
+class Timed:
+    # Loader that records every call, cache hits included.
+    #
+    # Everything else is looked up on the wrapped loader when asked for, so the counters, cache_info and cache_clear
+    # of a cache behind it stay live instead of being copied once.
+
+    def __init__(self, function):
+        self.function = function
+
+        # Name and docstring only, copying the cache's __dict__ would freeze its counters.
+        functools.update_wrapper(self, function, updated=())
+
+    def __call__(self, *args, **kwargs):
+        profiler = getattr(_local, 'profiler', None)
+        if profiler is None or not profiler.enabled:
+            return self.function(*args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return self.function(*args, **kwargs)
+        finally:
+            profiler.record(self.__name__, 'loader', time.perf_counter() - start)
+
+    def __getattr__(self, name):
+        # Only called for attributes the wrapper does not have itself.
+        if name == 'function':
+            raise AttributeError(name)
+
+        return getattr(self.function, name)
+
+
+def timed(function):
+    return Timed(function)
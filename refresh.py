@@ -0,0 +1,118 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+import backtest
+import data
+import models
+import regression
+import summary
+
+
+def refresh(path, metric=None):
+    # Dataset of the new release.
+    metric = metric or dataset_of(path)
+    workbook = data.WORKBOOKS[metric]
+
+    # Current store, coefficients and summaries, saved under the current workbook hashes.
+    store = data.load_store()
+    coefficients = regression.load_coefficients()
+    summaries = summary.load_summary()
+    fits = models.load_fits()
+    times = models.TIMES.read(data.fingerprint())
+    tests = backtest.read_backtest()
+
+    # Copy of the release next to the workbook under the same name, so its parsed sheets are cached for it.
+    directory = tempfile.mkdtemp(prefix='.refresh-', dir=os.path.dirname(os.path.abspath(workbook)))
+    release = os.path.join(directory, os.path.basename(workbook))
+    previous = f'{release}.previous'
+    shutil.copyfile(path, release)
+
+    try:
+        # Parse and merge the release before it replaces anything, a malformed one stops here.
+        old = store.loc[[metric]].reset_index()
+        new = data.load_dataset(metric, release)
+        changes = data.diff(old, new)
+
+        # Merge the deltas, then rejoin the expenditure and keep the rows of it that moved.
+        merged = data.apply_changes(store, changes)
+        derived = data.diff(store.loc[[data.EXPENDITURE]].reset_index(), data.expenditure(merged).reset_index())
+        merged = data.apply_changes(merged, derived)
+        changes = pd.concat([changes, derived]).sort_index()
+
+        # Put the release in place of the workbook, readers never see a partial file. The current one is kept, with
+        # its modification time, until the new tables are saved.
+        shutil.copy2(workbook, previous)
+        os.replace(release, workbook)
+
+        try:
+            # Save the store for the new workbook hashes before anything rebuilds it.
+            digests = data.fingerprint()
+            data.STORE.save(merged, digests)
+
+            # Refit every model and summarize the series with a changed row.
+            series = changes.index.droplevel('Year').unique()
+            regression.TABLE.save(regression.update_coefficients(coefficients, series), digests)
+            summary.TABLE.save(summary.update_summary(summaries, series), digests)
+            models.TABLE.save(models.update_fits(fits, series), digests)
+
+            # Fit times stay those of the last full fit, the refit covers only some series.
+            if times is not None:
+                models.TIMES.save(times, digests)
+
+            # Backtest the changed series too, if the backtest was run for the old workbooks.
+            if tests is not None:
+                backtest.TABLE.save(backtest.update_backtest(tests, series), digests)
+        except BaseException:
+            # Back to the release the saved tables were made from, or rebuilt from on the next start.
+            os.replace(previous, workbook)
+            raise
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return {'metric': metric,
+            'changes': changes,
+            'years': sorted(set(new['Year'].unique()) - set(old['Year'].unique())),
+            'series': series}
+
+
+def dataset_of(path):
+    # Tell the workbooks apart by their sheets.
+    sheets = set(pd.ExcelFile(path).sheet_names)
+
+    if data.PRICE_SHEET in sheets:
+        return data.PRICE
+
+    if set(data.CONSUMPTION_SECTORS) <= sheets:
+        return data.CONSUMPTION
+
+    raise ValueError(f'{path} is neither a consumption nor a price workbook')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge a new release of a workbook into the cached store and refit '
+                                                 'the series it changed.')
+    parser.add_argument('workbook', help='new release of use_tot_sector.xlsx or avgprice_annual.xlsx')
+    parser.add_argument('--dataset', choices=list(data.WORKBOOKS), help='dataset of the release, from its sheets '
+                                                                         'by default')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = refresh(args.workbook, args.dataset)
+
+    # Print what changed, the expenditure follows both workbooks.
+    for metric, changes in result['changes'].groupby(level='Metric', sort=False):
+        counts = changes['change'].value_counts()
+        print(f'{metric}: {counts.get("added", 0)} rows added, {counts.get("changed", 0)} changed, '
+              f'{counts.get("removed", 0)} removed.')
+    print(f'New years: {", ".join(str(year) for year in result["years"]) or "none"}.')
+    print(f'Refit and summarized {len(result["series"])} series.')
+    print(f'Refresh took {(time.perf_counter() - start) * 1e3:.1f} ms.')
+
+
+if __name__ == '__main__':
+    main()
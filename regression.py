@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+
+import cube
+import data
+import ingest
+
+# Index of the coefficient table.
+INDEX = ['Metric', 'Sector', 'Provider', 'State']
+
+# Coefficients saved in the cache, updated by an incremental refresh or else fitted by one worker for all of them.
+TABLE = ingest.Table('coefficients', INDEX, lambda: pd.concat([_fit_cube(metric) for metric in data.METRICS]))
+
+
+def load_coefficients():
+    # Refit only when one of the workbooks changes.
+    return TABLE.load(data.fingerprint())
+
+
+def coefficients(metric, sector, provider, state):
+    table = load_coefficients()
+    key = (metric, sector, provider, state)
+
+    # Series without data have no fitted line.
+    if key not in table.index:
+        return pd.Series(data=np.nan,
+                         index=table.columns,
+                         name=key)
+
+    # Fitted line of one series.
+    return table.loc[key]
+
+
+def forecast(coefficients, years, level=0.95):
+    # Accept a single row of the coefficient table.
+    if isinstance(coefficients, pd.Series):
+        coefficients = pd.DataFrame(data=[coefficients.to_numpy()],
+                                    columns=coefficients.index,
+                                    index=pd.MultiIndex.from_tuples([coefficients.name], names=INDEX))
+
+    years = np.atleast_1d(np.asarray(years, dtype='float64'))
+
+    # Coefficients as column vectors so every series meets every year.
+    n = coefficients['n'].to_numpy()[:, None]
+    slope = coefficients['slope'].to_numpy()[:, None]
+    intercept = coefficients['intercept'].to_numpy()[:, None]
+    sigma = coefficients['sigma'].to_numpy()[:, None]
+    x_mean = coefficients['x_mean'].to_numpy()[:, None]
+    sxx = coefficients['sxx'].to_numpy()[:, None]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Point predictions.
+        prediction = intercept + slope * years
+
+        # Standard error of a new observation at each year.
+        se = sigma * np.sqrt(1 + 1 / n + (years - x_mean) ** 2 / sxx)
+
+        # Two sided Student t quantile with n - 2 degrees of freedom.
+        t = t_quantile(level, n - 2)
+
+    # One row per series and year.
+    index = coefficients.index.repeat(len(years))
+    index = pd.MultiIndex.from_arrays([index.get_level_values(name) for name in index.names] +
+                                      [np.tile(years.astype('int64'), len(coefficients))],
+                                      names=list(coefficients.index.names) + ['Year'])
+
+    return pd.DataFrame({'prediction': prediction.ravel(),
+                         'lower': (prediction - t * se).ravel(),
+                         'upper': (prediction + t * se).ravel()},
+                        index=index)
+
+
+def t_quantile(level, dof):
+    # Two sided Student t quantile, scipy.stats takes a second to import so only forecasts and fits load it.
+    from scipy import stats
+
+    return stats.t.ppf((1 + level) / 2, dof)
+
+
+def t_pvalue(t, dof):
+    # Two sided p-value of a Student t statistic.
+    from scipy import stats
+
+    return 2 * stats.t.sf(np.abs(t), dof)
+
+
+def diagnostics(coefficients):
+    # Parameter table of one fitted series, the columns of the statsmodels summary without building it.
+    return pd.DataFrame({'coef': coefficients[['intercept', 'slope']].to_numpy(dtype='float64'),
+                         'std err': coefficients[['intercept_se', 'slope_se']].to_numpy(dtype='float64'),
+                         't': coefficients[['intercept_t', 'slope_t']].to_numpy(dtype='float64'),
+                         'P>|t|': coefficients[['intercept_p', 'slope_p']].to_numpy(dtype='float64')},
+                        index=pd.Index(['intercept', 'year']))
+
+
+def ols_summary(x, y, name):
+    # Full statsmodels summary of one series, statsmodels is only imported when it is asked for.
+    import statsmodels.api as sm
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    keep = ~np.isnan(y)
+
+    results = sm.OLS(y[keep], sm.add_constant(x[keep])).fit()
+
+    return results.summary(yname=name, xname=['intercept', 'year'])
+
+
+def fit(x, y, diagnostics=False):
+    # Ordinary least squares of every row of y against x, ignoring NaN.
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    mask = ~np.isnan(y)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Number of points per series.
+        n = mask.sum(axis=1)
+
+        # Means over the observed points only.
+        x_mean = np.where(mask, x, 0).sum(axis=1) / n
+        y_mean = np.where(mask, y, 0).sum(axis=1) / n
+
+        # Centered sums of squares and cross products.
+        dx = np.where(mask, x - x_mean[:, None], 0)
+        dy = np.where(mask, y - y_mean[:, None], 0)
+        sxx = (dx * dx).sum(axis=1)
+        sxy = (dx * dy).sum(axis=1)
+        syy = (dy * dy).sum(axis=1)
+
+        # Closed form slope and intercept.
+        slope = sxy / sxx
+        intercept = y_mean - slope * x_mean
+
+        # Residual sum of squares and goodness of fit.
+        residuals = np.where(mask, y - (intercept[:, None] + slope[:, None] * x), 0)
+        sse = (residuals * residuals).sum(axis=1)
+        r2 = 1 - sse / syy
+
+        # Standard errors, two parameters are estimated.
+        sigma = np.sqrt(sse / (n - 2))
+        slope_se = sigma / np.sqrt(sxx)
+        intercept_se = sigma * np.sqrt(1 / n + x_mean ** 2 / sxx)
+
+    # Series with fewer than three points have no usable fit.
+    usable = n > 2
+
+    df = pd.DataFrame({'n': n,
+                       'slope': np.where(n > 1, slope, np.nan),
+                       'intercept': np.where(n > 1, intercept, np.nan),
+                       'r2': np.where(usable, r2, np.nan),
+                       'slope_se': np.where(usable, slope_se, np.nan),
+                       'intercept_se': np.where(usable, intercept_se, np.nan),
+                       'sigma': np.where(usable, sigma, np.nan),
+                       'x_mean': x_mean,
+                       'sxx': sxx})
+
+    if diagnostics:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # t statistics and p-values of both parameters, with n - 2 degrees of freedom.
+            for parameter in ('slope', 'intercept'):
+                df[f'{parameter}_t'] = df[parameter] / df[f'{parameter}_se']
+                df[f'{parameter}_p'] = t_pvalue(df[f'{parameter}_t'].to_numpy(), n - 2)
+
+            # Durbin-Watson over consecutive observed points, gaps are skipped like statsmodels drops them.
+            order = np.argsort(~mask, axis=1, kind='stable')
+            observed = np.take_along_axis(residuals, order, axis=1)
+            pairs = np.take_along_axis(mask, order, axis=1)[:, 1:]
+            steps = np.where(pairs, np.diff(observed, axis=1), 0)
+            df['durbin_watson'] = np.where(usable, (steps * steps).sum(axis=1) / sse, np.nan)
+
+    return df
+
+
+def update_coefficients(coefficients, series):
+    # Refit the given (metric, sector, provider, state) series on the current data, keep the other rows.
+    kept = coefficients[~coefficients.index.isin(series)]
+    fitted = [_fit_cube(metric, series) for metric in series.get_level_values('Metric').unique()]
+
+    return pd.concat([kept] + fitted).sort_index()
+
+
+def _fit_cube(metric, series=None):
+    years, rows, labels = cube.rows(metric, series)
+
+    # Fit all series at once.
+    df = fit(years, rows, diagnostics=True)
+    df.index = labels
+
+    # Drop combinations without data.
+    return df[df['n'] > 0]
@@ -0,0 +1,244 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+
+import pandas as pd
+import plotly.offline
+
+import data
+import figures
+import ingest
+import main as app
+import models
+
+# Output formats and their file extensions.
+FORMATS = {'html': 'html',
+           'png': 'png',
+           'json': 'json'}
+
+# Chart types.
+KINDS = ('choropleth', 'line', 'scatter')
+
+# Hashes of the charts already written, by path without extension.
+MANIFEST = 'manifest.json'
+
+
+def tasks(kinds=KINDS):
+    # Every widget combination of every chart type, as the app would show them.
+    for dataset, config in app.DATASETS.items():
+        first, last = app.year_range(config)
+
+        for sector in config['sectors']:
+            for provider in config['providers'] or (None,):
+                if 'choropleth' in kinds:
+                    for dmv in (False, True):
+                        for year in range(first, last + 1):
+                            yield {'dataset': dataset, 'kind': 'choropleth', 'sector': sector, 'provider': provider,
+                                   'region': 'DMV' if dmv else 'U.S.', 'year': year}
+
+                if 'line' in kinds:
+                    yield {'dataset': dataset, 'kind': 'line', 'sector': sector, 'provider': provider}
+
+                if 'scatter' in kinds:
+                    for state in app.SCATTER_STATES:
+                        yield {'dataset': dataset, 'kind': 'scatter', 'sector': sector, 'provider': provider,
+                               'state': state}
+
+
+def frame(task):
+    # DataFrame and title of a chart, from the app's loaders.
+    config = app.DATASETS[task['dataset']]
+    args = app.series_args(task['sector'], task['provider'])
+    name = f'{config["title"]} {{}} {app.describe(task["sector"], task["provider"])}'
+
+    if task['kind'] == 'choropleth':
+        loader = config['loaders']['choro_dmv' if task['region'] == 'DMV' else 'choro_us']
+        return loader(*args, task['year']), f'{name.format(task["region"])} {task["year"]}'
+
+    first, last = app.year_range(config)
+    if task['kind'] == 'line':
+        return config['loaders']['line'](*args), f'{name.format("DMV")} {first}-{last}'
+
+    return config['loaders']['scatter'](*args, task['state']), f'{name.format(task["state"])} {first}-{last}'
+
+
+def figure(task, df, title):
+    # Figure of a chart, from the app's figure builders.
+    config = app.DATASETS[task['dataset']]
+
+    if task['kind'] == 'choropleth':
+        return figures.choropleth(df=df,
+                                  title=title,
+                                  label=config['unit'],
+                                  dmv=task['region'] == 'DMV',
+                                  color_continuous_scale=config['scale'])
+
+    if task['kind'] == 'line':
+        return figures.line(df=df,
+                            title=title,
+                            label=config['axis'])
+
+    # The app's default model, the straight OLS line.
+    results = models.params('linear', config['metric'], task['sector'], task['provider'] or data.ALL_PROVIDERS,
+                            task['state'])
+
+    return figures.scatter(df=df,
+                           title=title,
+                           label=config['axis'],
+                           fitted=models.fitted('linear', df['Year'], df['value'], results))
+
+
+def path(task):
+    # Output path without extension: dataset/kind/sector[-provider][-region or state][-year].
+    parts = [task['sector'], task['provider'], task.get('region'), task.get('state'), task.get('year')]
+    name = '-'.join(_slug(part) for part in parts if part is not None)
+
+    return os.path.join(_slug(task['dataset']), task['kind'], name)
+
+
+def digest(df, title):
+    # Hash of the data and title of a chart.
+    sha = hashlib.sha256(title.encode())
+    sha.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+
+    return sha.hexdigest()
+
+
+def render(task, output_dir, formats):
+    start = time.perf_counter()
+
+    # Build the chart.
+    df, title = frame(task)
+    fig = figure(task, df, title)
+
+    # Write every format.
+    base = os.path.join(output_dir, path(task))
+    for file_format in formats:
+        file_name = f'{base}.{FORMATS[file_format]}'
+
+        if file_format == 'html':
+            # The plotly.js bundle is written once per directory before the workers start.
+            fig.write_html(file_name, include_plotlyjs='directory')
+        elif file_format == 'png':
+            fig.write_image(file_name)
+        else:
+            with open(file_name, 'w') as f:
+                f.write(fig.to_json())
+
+    return time.perf_counter() - start
+
+
+def report(output_dir, formats=('html',), kinds=KINDS, max_workers=None, force=False):
+    manifest = {} if force else _read_manifest(output_dir)
+
+    # Hash every chart's data, the loaders are cheap next to rendering.
+    pending = []
+    skipped = empty = 0
+    for task in tasks(kinds):
+        df, title = frame(task)
+        key = path(task)
+
+        if df.empty:
+            empty += 1
+            continue
+
+        chart_hash = digest(df, title)
+        entry = manifest.get(key)
+        written = all(os.path.exists(os.path.join(output_dir, f'{key}.{FORMATS[f]}')) for f in formats)
+        if entry and entry['hash'] == chart_hash and set(formats) <= set(entry['formats']) and written:
+            skipped += 1
+            continue
+
+        pending.append((task, chart_hash))
+
+    print(f'{len(pending)} charts to render, {skipped} unchanged, {empty} without data.')
+
+    # Directories and the plotly.js bundle next to the HTML files.
+    for directory in {os.path.dirname(os.path.join(output_dir, path(task))) for task, _ in pending}:
+        os.makedirs(directory, exist_ok=True)
+        bundle = os.path.join(directory, 'plotly.min.js')
+        if 'html' in formats and not os.path.exists(bundle):
+            with open(bundle, 'w') as f:
+                f.write(plotly.offline.get_plotlyjs())
+
+    seconds = {kind: 0.0 for kind in kinds}
+    if not pending:
+        return seconds
+
+    start = time.perf_counter()
+
+    # Render in parallel, spawned workers import the app once each.
+    rendered = ingest.map_spawned(render, [(task, output_dir, formats) for task, _ in pending], max_workers)
+
+    for done, ((task, chart_hash), task_seconds) in enumerate(zip(pending, rendered), start=1):
+        seconds[task['kind']] += task_seconds
+
+        manifest[path(task)] = {'hash': chart_hash,
+                                'formats': sorted(formats)}
+
+        # Report progress about every 5%, and save the manifest so an interrupted run resumes.
+        if done == len(pending) or done % max(1, len(pending) // 20) == 0:
+            _write_manifest(output_dir, manifest)
+            elapsed = time.perf_counter() - start
+            print(f'[{done}/{len(pending)}] {elapsed:.1f} s elapsed, '
+                  f'{elapsed / done * (len(pending) - done):.1f} s left', flush=True)
+
+    return seconds
+
+
+def _slug(part):
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(part)).strip('_')
+
+
+def _read_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(output_dir, manifest):
+    os.makedirs(output_dir, exist_ok=True)
+
+    path_ = os.path.join(output_dir, MANIFEST)
+    tmp = f'{path_}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path_)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render every chart of the app for every widget combination.')
+    parser.add_argument('output_dir', nargs='?', default='report')
+    parser.add_argument('--format', dest='formats', action='append', choices=list(FORMATS),
+                        help='output format, can be repeated, html by default')
+    parser.add_argument('--kind', dest='kinds', action='append', choices=KINDS,
+                        help='chart type, can be repeated, all of them by default')
+    parser.add_argument('--workers', type=int, help='worker processes, the CPU count by default')
+    parser.add_argument('--force', action='store_true', help='render charts whose data did not change too')
+    args = parser.parse_args()
+
+    formats = tuple(args.formats or ('html',))
+
+    # PNG export needs kaleido.
+    if 'png' in formats:
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            parser.error('PNG output needs kaleido, pip install kaleido')
+
+    start = time.perf_counter()
+    seconds = report(args.output_dir, formats=formats, kinds=tuple(args.kinds or KINDS), max_workers=args.workers,
+                     force=args.force)
+
+    for kind, total in seconds.items():
+        print(f'{kind:<12} {total:>8.1f} s of rendering')
+    print(f'Report took {time.perf_counter() - start:.1f} s.')
+
+
+if __name__ == '__main__':
+    main()
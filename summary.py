@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+import data
+import ingest
+
+# Index of the summary table.
+INDEX = ['Metric', 'Sector', 'Provider', 'State']
+
+# Summary saved in the cache, updated by an incremental refresh or else built by one worker for all of them.
+TABLE = ingest.Table('summary', INDEX, lambda: summarize(data.load_store()))
+
+
+def load_summary():
+    # Recompute only when one of the workbooks changes.
+    return TABLE.load(data.fingerprint())
+
+
+def stats(metric, sector, provider, state):
+    table = load_summary()
+    key = (metric, sector, provider, state)
+
+    # Series without data have no statistics.
+    if key not in table.index:
+        return pd.Series(data=np.nan,
+                         index=table.columns,
+                         name=key)
+
+    # Statistics of one series.
+    return table.loc[key]
+
+
+def summarize(store):
+    # One row per series: count, min, max, mean, first and last year, CAGR and year of the peak.
+    df = store.dropna().reset_index()
+    df['value'] = data.widen(df['value'])
+
+    # Rows are sorted by year within each series, so first and last are the ends of the series.
+    df = df.groupby(INDEX, observed=True).agg(n=('value', 'size'),
+                                              min=('value', 'min'),
+                                              max=('value', 'max'),
+                                              mean=('value', 'mean'),
+                                              first_year=('Year', 'first'),
+                                              last_year=('Year', 'last'),
+                                              first=('value', 'first'),
+                                              last=('value', 'last'),
+                                              peak=('value', 'idxmax'))
+
+    # Row labels of the peaks are positions in the reset store.
+    df['peak_year'] = store.index.get_level_values('Year')[store['value'].notna()][df['peak'].to_numpy()]
+
+    # Compound annual growth rate between the first and last year, undefined for a non-positive start.
+    span = (df['last_year'] - df['first_year']).astype('float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = (df['last'] / df['first']) ** (1 / span) - 1
+    df['cagr'] = cagr.where((span > 0) & (df['first'] > 0))
+
+    return df[['n', 'min', 'max', 'mean', 'cagr', 'peak_year', 'first_year', 'last_year']]
+
+
+def update_summary(summary, series):
+    # Recompute the given (metric, sector, provider, state) series on the current data, keep the other rows.
+    store = data.load_store()
+    rows = store[store.index.droplevel('Year').isin(series)]
+
+    kept = summary[~summary.index.isin(series)]
+
+    return pd.concat([kept, summarize(rows)]).sort_index()
@@ -0,0 +1,110 @@
+import os
+import sys
+
+import pytest
+
+# The app modules live in the repository root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import caching
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Fake monotonic clock, moved forward by the test.
+    now = [0.0]
+    monkeypatch.setattr(caching.time, 'monotonic', lambda: now[0])
+
+    return now
+
+
+def test_evicts_least_recently_used():
+    calls = []
+    cache = caching.BoundedCache(function=lambda x: calls.append(x) or x * 2, max_entries=2)
+
+    cache(1)
+    cache(2)
+    # Using 1 again makes 2 the oldest, so 3 evicts it.
+    assert cache(1) == 2
+    cache(3)
+
+    assert list(cache.entries) == [((1,), ()), ((3,), ())]
+    assert cache(2) == 4
+    assert calls == [1, 2, 3, 2]
+    assert cache.cache_info()['evictions'] == 2
+
+
+def test_entries_expire(clock):
+    calls = []
+    cache = caching.BoundedCache(function=lambda x: calls.append(x) or x, ttl=10)
+
+    cache(1)
+    clock[0] = 9.9
+    cache(1)
+    assert calls == [1]
+
+    # Past the expiry the result is computed again, and then valid for another ttl.
+    clock[0] = 10.0
+    cache(1)
+    clock[0] = 19.9
+    cache(1)
+    assert calls == [1, 1]
+    assert cache.cache_info()['expirations'] == 1
+
+
+def test_no_ttl_never_expires(clock):
+    calls = []
+    cache = caching.BoundedCache(function=lambda x: calls.append(x) or x, ttl=None)
+
+    cache(1)
+    clock[0] = 1e9
+    cache(1)
+
+    assert calls == [1]
+
+
+def test_version_change_invalidates():
+    version = ['a']
+    calls = []
+    cache = caching.BoundedCache(function=lambda x: calls.append(x) or x, version=lambda: version[0])
+
+    cache(1)
+    cache(1)
+    version[0] = 'b'
+    cache(1)
+    cache(1)
+
+    assert calls == [1, 1]
+    # The entry of the older version is left to age out.
+    assert len(cache.entries) == 2
+
+
+def test_counters_and_clear():
+    cache = caching.BoundedCache(function=lambda x, y=0: x + y, max_entries=1)
+
+    cache(1)
+    cache(1)
+    cache(1, y=1)
+    cache(1, y=1)
+    cache(1)
+
+    info = cache.cache_info()
+    assert (info['hits'], info['misses'], info['evictions'], info['entries']) == (2, 3, 2, 1)
+
+    cache.cache_clear()
+    info = cache.cache_info()
+    assert (info['hits'], info['misses'], info['evictions'], info['expirations'], info['entries']) == (0, 0, 0, 0, 0)
+
+
+def test_decorator_reports_stats(monkeypatch):
+    # Registered apart from the app's own caches.
+    monkeypatch.setattr(caching, '_caches', [])
+
+    @caching.bounded_cache(max_entries=4, ttl=None)
+    def double(x):
+        return x * 2
+
+    assert double(2) == 4
+    assert double.__name__ == 'double'
+    assert caching.stats() == [double.cache_info()]
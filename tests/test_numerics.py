@@ -0,0 +1,105 @@
+import os
+import shutil
+import sys
+
+import openpyxl
+import pandas as pd
+import pytest
+
+# The app modules live in the repository root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import cube
+import data
+import ingest
+import models
+import refresh
+import regression
+import summary
+
+# Tables a refresh updates.
+TABLES = [data.STORE, regression.TABLE, summary.TABLE, models.TABLE]
+
+
+@pytest.fixture
+def workbooks(tmp_path, monkeypatch):
+    # Copies of both workbooks and an empty cache, so the repository's own cache is left alone.
+    for workbook in data.WORKBOOKS.values():
+        shutil.copy(os.path.join(ROOT, workbook), tmp_path)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ingest, 'CACHE_DIR', str(tmp_path / 'cache'))
+    _clear()
+
+    yield tmp_path
+
+    _clear()
+
+
+def test_refresh_matches_full_rebuild(workbooks, monkeypatch):
+    # Tables of the current release.
+    for table in TABLES:
+        table.load(data.fingerprint())
+
+    # New release: one more year and one revised value.
+    release = _price_release(workbooks / 'release.xlsx')
+    refresh.refresh(str(release))
+    digests = data.fingerprint()
+    incremental = [table.read(digests) for table in TABLES]
+
+    # Every table built again from the new workbooks alone.
+    monkeypatch.setattr(ingest, 'CACHE_DIR', str(workbooks / 'full'))
+    _clear()
+
+    for table, merged in zip(TABLES, incremental):
+        pd.testing.assert_frame_equal(merged, table.load(digests), check_dtype=False, check_categorical=False,
+                                      check_index_type=False, rtol=1e-9)
+
+
+def test_malformed_release_leaves_the_workbook(workbooks):
+    store = data.load_store()
+    digests = data.fingerprint()
+
+    # A consumption release with a value under a blank header, the year columns cannot be parsed.
+    workbook = openpyxl.load_workbook(data.CONSUMPTION_WORKBOOK)
+    sheet = workbook[data.CONSUMPTION_SECTORS[0]]
+    sheet.cell(row=data.CONSUMPTION_HEADER + 3, column=sheet.max_column + 1).value = 1
+    workbook.save(workbooks / 'release.xlsx')
+
+    with pytest.raises(ValueError):
+        refresh.refresh(str(workbooks / 'release.xlsx'))
+
+    # The workbook, and so the store saved for it, are the ones of the current release.
+    assert data.fingerprint() == digests
+    assert data.STORE.read(digests) is store
+    assert not [name for name in os.listdir(workbooks) if name.startswith('.refresh-')]
+
+
+def _price_release(path):
+    # The price workbook with the last year repeated 2% higher as a new year, and one earlier value revised.
+    workbook = openpyxl.load_workbook(data.PRICE_WORKBOOK)
+    sheet = workbook[data.PRICE_SHEET]
+
+    # The title is on the first row and the header on the second.
+    rows = list(sheet.iter_rows(min_row=3, values_only=True))
+    last = max(row[0] for row in rows)
+
+    for row in rows:
+        if row[0] == last:
+            sheet.append([last + 1] + list(row[1:3]) +
+                         [value * 1.02 if isinstance(value, (int, float)) else value for value in row[3:]])
+
+    sheet.cell(row=4, column=4).value += 1
+    workbook.save(path)
+
+    return path
+
+
+def _clear():
+    # Forget the tables and cubes this process has read.
+    for table in TABLES:
+        table.cache_clear()
+
+    models.TIMES.cache_clear()
+    cube._build_cube.cache_clear()
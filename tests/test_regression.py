@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+import statsmodels.api as sm
+from statsmodels.stats.stattools import durbin_watson
+
+# The app modules live in the repository root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import regression
+
+
+def test_diagnostics_match_statsmodels():
+    # Series with gaps, a trend and noise.
+    rng = np.random.default_rng(0)
+    years = np.arange(1990, 2021, dtype='float64')
+    y = 3 + 0.5 * (years - 1990)[None, :] + rng.normal(scale=2, size=(4, len(years)))
+    y[0, [3, 4, 10]] = np.nan
+    y[1, :5] = np.nan
+    y[2, -7:] = np.nan
+
+    df = regression.fit(years, y, diagnostics=True)
+
+    for i in range(len(y)):
+        keep = ~np.isnan(y[i])
+        results = sm.OLS(y[i, keep], sm.add_constant(years[keep])).fit()
+        row = df.iloc[i]
+
+        np.testing.assert_allclose([row['intercept'], row['slope']], results.params, rtol=1e-9)
+        np.testing.assert_allclose([row['intercept_se'], row['slope_se']], results.bse, rtol=1e-6)
+        np.testing.assert_allclose([row['intercept_p'], row['slope_p']], results.pvalues, rtol=1e-6, atol=1e-300)
+        np.testing.assert_allclose(row['r2'], results.rsquared, rtol=1e-9)
+        np.testing.assert_allclose(row['durbin_watson'], durbin_watson(results.resid), rtol=1e-9)
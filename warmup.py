@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+
+import cube
+import data
+import geometry
+import models
+import regression
+import summary
+
+# Environment variable turning the background warm-up off, e.g. DMV_WARM_UP=0.
+ENV = 'DMV_WARM_UP'
+
+# Seconds each step took, in the order they ran.
+timings = {}
+
+# One warm-up per process.
+_lock = threading.Lock()
+_thread = None
+
+
+def enabled():
+    return os.environ.get(ENV, '1') != '0'
+
+
+def start():
+    # Load what the first interactions need on a background thread, while the first page renders.
+    global _thread
+
+    with _lock:
+        if _thread is None and enabled():
+            _thread = threading.Thread(target=run, name='warm-up', daemon=True)
+            _thread.start()
+
+    return _thread
+
+
+def run():
+    # Another thread needing the same table waits for it in ingest instead of building it twice.
+    for name, step in _steps():
+        start = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - start
+
+    return timings
+
+
+def _steps():
+    steps = [('sheets', data.warm_up)]
+
+    for metric in data.METRICS:
+        steps.append((f'{metric} cube', lambda metric=metric: cube.load_cube(metric)))
+
+    steps += [('summary', summary.load_summary),
+              ('coefficients', regression.load_coefficients),
+              ('models', models.load_fits),
+              ('geometry', lambda: [geometry.load(dmv) for dmv in (False, True)]),
+              # Only forecasts import scipy.stats, it takes about a second.
+              ('scipy.stats', lambda: regression.t_quantile(0.95, 1))]
+
+    return steps
+
+
+def main():
+    # Fill the cache directory before the server workers start, or time each step.
+    start = time.perf_counter()
+    for name, seconds in run().items():
+        print(f'{name:<24} {seconds * 1e3:>8.1f} ms')
+
+    print(f'Warm-up took {(time.perf_counter() - start) * 1e3:.1f} ms.')
+
+
+if __name__ == '__main__':
+    main()